@@ -56,6 +56,8 @@ Version 410.1 using PySide6.8.2.1 and python3.13.2 (64-bit).
 
 """
 import re
+import subprocess
+import sys
 import time
 from os import environ
 from sys import exit, argv
@@ -63,34 +65,37 @@ from sys import exit, argv
 # Suppress pygame welcome message
 environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "1"
 
-# Pygame is solely used for an error sound.
-from pygame import mixer
-
-from copy import deepcopy
+from bisect import bisect_right
+from importlib import import_module
 from io import open
-from itertools import chain
+from multiprocessing import freeze_support
+from multiprocessing.process import BaseProcess
 from json import load, loads, dump, JSONDecodeError
 from os import path, getenv
 from pathlib import Path
 from platform import system
 from shutil import copy2
 from string import ascii_letters, digits
+from threading import Lock
+from concurrent.futures import Future
 
-from roman import fromRoman, InvalidRomanNumeralError
 from typing import Any
 from datetime import datetime, timedelta
 
 from PySide6 import QtCore
 from PySide6 import QtGui
-from PySide6 import QtPrintSupport
 from PySide6 import QtWidgets
-from PySide6.QtGui import QIcon, QColor, QFont, QPixmap
-from PySide6.QtPrintSupport import QPrintDialog
+from PySide6.QtGui import QIcon, QColor, QFont, QPixmap, QTextCharFormat
 from PySide6.QtWidgets import (QDialogButtonBox, QApplication, QPlainTextEdit, QLineEdit, QComboBox,
                                QGridLayout, QWidget, QMessageBox, QSplashScreen, QPushButton, QDialog,
                                QSizePolicy, QSpacerItem)
 
-from find import Ui_Dialog
+from corpus import (LAST_VERSE_IN_BIBLE, BlockMap, OffsetMap, VerseTable,
+                    build_raw_index, load_bundle, load_raw_index, read_lines)
+from processes import start_process
+from search import (PositionalIndex, PostingStore, Ranked, Ranking, RawText, RegexPool,
+                    ResultCache, SearchLimit, SearchResult, SuffixArray, TypedPhrase, bm25,
+                    compile_regex, intersect, nested_quantifier, regex_words, restrict)
 
 try:
     from ctypes import windll  # Only exists on Windows.
@@ -111,27 +116,89 @@ theme_state = {
 }
 date_index: int = 0  # Hours relative to today's date.
 
-mixer.init()
+# The orders of Any of the words results, as in settings: their names.
+RANKINGS: dict[str, str] = {"bm25": "Best match (BM25)", "count": "Most matches"}
+
+
+
+class Lazy:
+    """Stands for what make() returns, which is only made when first used.
+
+    For the parts of Abib that are slow to load and may not be needed at
+    all in a session.
+    """
+
+    def __init__(self, make) -> None:
+        self._make = make
+        self._made = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._made is None:
+            self._made = self._make()
+        return getattr(self._made, name)
+
+
+class SystemBeep:
+    """The system's beep, for the error sound when pygame can't play it."""
+
+    def play(self) -> None:
+        QApplication.beep()
 
-def readfile(input_path: str, input_filename: str, file_length: int) -> list:
-    """File reading routine — reads a text file into a list."""
 
-    # print('readio ', input_filename)
-    err = "Abib is not in the same directory as its files and folders.\n"
-    output_listname = []
+def load_beep() -> Any:
+    """The error sound, with pygame's mixer started for it.
+
+    Without pygame, or a device for it to play on, it is the system's
+    beep, so that loading isn't tried again at every beep.
+    """
+
     try:
-        with open(f'{input_path}{input_filename}', 'r') as f_read:
-            for _ in range(file_length):
-                x5 = f_read.readline()
-                try:
-                    i_line = int(x5.splitlines()[0])  # Convert to int if possible
-                except ValueError:
-                    i_line = x5.splitlines()[0]  # Keep as string if conversion fails
-                output_listname.append(i_line)
-    except FileNotFoundError:
-        exit(err)  # Exit program with an error message
+        # Pygame is solely used for an error sound.
+        import pygame
+    except ImportError as err:
+        print(f'No error sound: {err}')
+        return SystemBeep()
+    try:
+        pygame.mixer.init()
+        sound = pygame.mixer.Sound('sound.mp3')
+    except (pygame.error, OSError) as err:
+        print(f'No error sound: {err}')
+        return SystemBeep()
+    sound.set_volume(0.5)  # Set volume to 50%
+
+    return sound
+
+
+beep_sound = Lazy(load_beep)
+roman = Lazy(lambda: import_module('roman'))
+QtPrintSupport = Lazy(lambda: import_module('PySide6.QtPrintSupport'))
+find = Lazy(lambda: import_module('find'))  # The Find dialog, made by pyside6-uic.
+
+
+def report_import_time() -> None:
+    """Print what importing Abib costs, module by module.
+
+    It is imported again in a new interpreter with -X importtime, and the
+    slowest modules listed.  Set ABIB_IMPORT_TIME to have Abib do this as
+    it starts.
+    """
 
-    return output_listname
+    if getattr(sys, 'frozen', False):
+        print('The import time can only be reported when run from source.')
+        return
+    report = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import Abib'],
+                            cwd=path.dirname(path.abspath(__file__)),
+                            capture_output=True, text=True).stderr
+    modules = []
+    for line in report.splitlines():
+        fields = line.removeprefix('import time:').split('|')
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            modules.append((int(fields[1]), int(fields[0]), fields[2].rstrip()))
+    total = sum(own for _, own, _ in modules)
+    print(f'Importing Abib takes {total / 1000:.0f} ms.  The slowest modules:')
+    print(f'{"cumulative":>11} {"self":>8}  (ms)')
+    for cumulative, own, name in sorted(modules, reverse=True)[:20]:
+        print(f'{cumulative / 1000:>11.1f} {own / 1000:>8.1f} {name}')
 
 
 def split_strip(_key: str) -> tuple[int, str]:
@@ -149,12 +216,68 @@ def split_strip(_key: str) -> tuple[int, str]:
     return num, _key
 
 
+def key_for_find(_key: str, raw: bool) -> str:
+    """Adjust _key for searching in Rnew, which has no Unicode italics.
+
+    It also has a different apostrophe and uses æ and Æ.  A '-' is kept
+    only for a Raw search.
+    """
+
+    p = "():,’;-?[].!<>"
+    ae: list[str] = ['aea', 'aeu', 'aes', 'aet', 'aene', 'aeno', 'AEno', 'AEne', 'Aeno', 'Aene']
+    ae_unicode: list[str] = ['æa', 'æu', 'æs', 'æt', 'æne', 'æno', 'Æno', 'Æne', 'Æno', 'Æne']
+    count = -1
+    for _ in ae:
+        count += 1
+        if _ in _key:
+            index = _key.find(_)
+            j = len(_)
+            j += index
+            _key = _key[:index] + ae_unicode[count] + _key[j:]
+            break
+    line = ''
+    for _ in _key:
+        if _ in p:
+            if _ == '-' and not raw:
+                continue
+            else:
+                line += _
+                continue
+        ch = ord(_)
+        if ch in range(119860, 119885):
+            ch -= 119795
+            line += chr(ch)
+        elif ch in range(119886, 119911):
+            ch -= 119789
+            line += chr(ch)
+        elif ch == 119997:
+            ch = 104
+            line += chr(ch)
+        elif ch == 39:
+            ch = 8217
+            line += chr(ch)
+        else:
+            line += _
+
+    return line
+
+
+def restore_search(result: SearchResult | None, current: int) -> None:
+    """Go back to the search, and its hit, saved by back_push or forward_push."""
+
+    w.result = result
+    if result is not None:
+        result.current = current
+        w.dlg.checks = list(result.checks)
+
+
 def back_push(x_) -> None:
     """Push onto the back stack."""
 
+    current = -1 if w.result is None else w.result.current
     if len(back) == 0:
         saving = (x_, w.y, w.hiLita.lineinc, w.hiLita.keyinc, w.hiLita.fmt,
-                  w.hiLita.length, w.no_f3_yet, w.occurring, w.key, w.dlg)
+                  w.hiLita.length, w.no_f3_yet, w.hiLita.key, w.result, current, w.dlg)
         back.append(saving)
     else:
         if back[-1][0] == x_ and back[-1][1] == w.y:
@@ -162,7 +285,7 @@ def back_push(x_) -> None:
         else:
             saving = (x_, w.y, w.hiLita.lineinc, w.hiLita.keyinc,
                       w.hiLita.fmt, w.hiLita.length, w.no_f3_yet,
-                      w.occurring, w.key, w.dlg)
+                      w.hiLita.key, w.result, current, w.dlg)
             back.append(saving)
 
 
@@ -179,9 +302,9 @@ def back_pop() -> int:
         w.hiLita.fmt = saving[4]
         w.hiLita.length = saving[5]
         w.no_f3_yet = saving[6]
-        w.occurring = saving[7]
-        w.key = saving[8]
-        w.dlg = saving[9]
+        w.hiLita.key = saving[7]
+        w.dlg = saving[10]
+        restore_search(saving[8], saving[9])
 
     return x_
 
@@ -189,9 +312,10 @@ def back_pop() -> int:
 def forward_push(x_) -> None:
     """Push onto the forward stack."""
 
+    current = -1 if w.result is None else w.result.current
     if len(forward) == 0:
         saving = (x_, w.y, w.hiLita.lineinc, w.hiLita.keyinc, w.hiLita.fmt,
-                  w.hiLita.length, w.no_f3_yet, w.occurring, w.key, w.dlg)
+                  w.hiLita.length, w.no_f3_yet, w.hiLita.key, w.result, current, w.dlg)
         forward.append(saving)
     else:
         if forward[-1][0] == x_ and forward[-1][1] == w.y:
@@ -199,7 +323,7 @@ def forward_push(x_) -> None:
         else:
             saving = (x_, w.y, w.hiLita.lineinc, w.hiLita.keyinc,
                       w.hiLita.fmt, w.hiLita.length, w.no_f3_yet,
-                      w.occurring, w.key, w.dlg)
+                      w.hiLita.key, w.result, current, w.dlg)
             forward.append(saving)
 
 
@@ -216,139 +340,88 @@ def forward_pop() -> int:
         w.hiLita.fmt = saving[4]
         w.hiLita.length = saving[5]
         w.no_f3_yet = saving[6]
-        w.occurring = saving[7]
-        w.key = saving[8]
-        w.dlg = saving[9]
+        w.hiLita.key = saving[7]
+        w.dlg = saving[10]
+        restore_search(saving[8], saving[9])
 
     return x_
 
 
-def create_pattern(key):
-    """Create a regex pattern based on the given key."""
-    return rf"\b{key[:-2]}[s’][s’]" if key[-2:] == "s’" else rf"\b{key}\b"
-
+def iterate_list(keywords: list[str], index: PositionalIndex, verses) -> tuple[list, list]:
+    """Find all the occurrences of key(s) in keywords in the sorted verses.
 
-def iterate_list(keywords: list[str], r_list: list) -> None:
-    """Iterate over r_list and find all the occurrences of key(s) in keywords."""
+    Return the verses they occur in, and the (start, end) of those in
+    each.  These come from the positional index, so no verse text is
+    scanned.  A key of several words is a phrase.
+    """
 
-    #  global w ----- Probably unnecessary!
-    w.occurring = 0
-    print(f'w.occurring = {w.occurring}')
-    w.occur = []
-    for i in w.occurs:
+    found_in: list[int] = []
+    spans: list[list] = []
+    if not len(verses):
+        return found_in, spans
+    x1, x2 = verses[0], verses[-1]
+    found = [index.verse_spans(key.split(' '), x1, x2) for key in keywords]
+    for i in verses:
         coordinates = []
-        for key in keywords:
-            pattern = create_pattern(key)
-            for m in re.finditer(pattern, r_list[i]):
-                w.occurring += 1
-                coordinates.append((m.start(), m.end()))
+        for by_verse in found:
+            coordinates.extend(by_verse.get(i, ()))
         if coordinates:
-            w.occur.append(coordinates)
-
-
-def findf3_ww_ac(x1: int, x2: int, numwords: int, _set: dict[str, set], r_list: list) -> None:
-    """Match whole words (phrase)."""
-
-    liszt = w.key.split(' ')
-    s = _set[liszt[0]] & _set[liszt[1]]
-    if numwords > 2:
-        for i in range(2, numwords):
-            j = liszt[i]
-            s = s & _set[j]
-    w.occur = sorted(list(s))
-    w.occurs = []
-    pattern = rf"\b{w.key}\b"
-    for i in w.occur:
-        if i < x1 or i > x2:
-            continue
-        if re.search(pattern, r_list[i]):
-            pass
-        else:
-            continue
-        w.occurs.append(i)
-    liszt = [w.key]
-    iterate_list(liszt, r_list)
-    c = 0
-    for i in w.occur:
-        li = len(i)
-        c += li
-    w.occurring = c
-
-
-def findf3_ww_all(x1: int, x2: int, numwords: int, _set: dict[str, set], r_list: list) -> None:
+            found_in.append(i)
+            spans.append(coordinates)
+
+    return found_in, spans
+
+
+def findf3_ww_ac(key: str, x1: int, x2: int, numwords: int, index: PositionalIndex,
+                 slop: int = 0) -> tuple[list, list]:
+    """Match whole words (phrase).
+
+    The words are matched by their positions in the index, so there is
+    no need to intersect their verses first.  A slop above 0 lets up to
+    that many other words come between them.
+    """
+
+    liszt = key.split(' ')[:numwords]
+    phrase = index.verse_spans(liszt, x1, x2, slop)
+    verses = sorted(phrase)
+    return verses, [phrase[i] for i in verses]
+
+
+def findf3_ww_all(key: str, x1: int, x2: int, numwords: int, _set: PostingStore,
+                  index: PositionalIndex) -> tuple[list, list]:
     """Match all the words (phrase)."""
 
-    liszt = w.key.split(' ')
+    liszt = key.split(' ')
     try:
-        s = _set[liszt[0]] & _set[liszt[1]]
+        s = intersect([_set[liszt[i]] for i in range(numwords)])
     except KeyError:
         print(f'liszt[0] {liszt[0]}')
         print(f'liszt[1] {liszt[1]}')
         raise KeyError
 
-    if numwords > 2:
-        for i in range(2, numwords):
-            s = s & _set[liszt[i]]
-    w.occur = sorted(list(s))
-    w.occurs = []
-    for i in w.occur:
-        if i < x1 or i > x2:
-            continue
-        w.occurs.append(i)
-    iterate_list(liszt, r_list)
-    w.occurring = len(w.occurs)
-
-
-def check_count_sort(liszt: list[str], r_list: list) -> None:
-    """Check matched words are whole, count and sort w.occurs (Any)."""
-
-    w.count = []
-    iterate_list(liszt, r_list)
-    lo = len(w.occur)
-    for i in range(lo):
-        w.count.append(len(w.occur[i]))
-
-    w.count, w.occurs, w.occur = zip(
-        *sorted(zip(w.count, w.occurs, w.occur), reverse=True))
-
-    w.occur = list(w.occur)
-    w.occurs = list(w.occurs)
-
-    newt: list = []
-    newts: list = []
-    j = w.count[0]
-    k = 0
-    t: list = []
-    ts: list = []
-    for i in w.count:
-        if (i == j) and (k < lo):
-            wok = w.occur[k]
-            t.append(wok)
-            woks = w.occurs[k]
-            ts.append(woks)
-            k += 1
-            j = i
-        elif (i != j) or (k == lo-1):
-            t.reverse()
-            ts.reverse()
-            newt.append(t)
-            newts.append(ts)
-            t = []
-            ts = []
-            if k < lo:
-                j = w.count[k]
-                wok = w.occur[k]
-                t.append(wok)
-                woks = w.occurs[k]
-                ts.append(woks)
-                k += 1
-    t.reverse()
-    ts.reverse()
-    newt.append(t)
-    newts.append(ts)
-    w.occur = list(chain.from_iterable(newt))
-    w.occurs = list(chain.from_iterable(newts))
-    w.occurring = len(w.occurs)
+    return iterate_list(liszt, index, restrict(s, x1, x2))
+
+
+def rank_verses(liszt: list[str], x1: int, x2: int, _set: PostingStore, index: PositionalIndex,
+                ranking: str) -> tuple[Ranking, Ranked]:
+    """Find the words of liszt in verses x1 to x2 and put the verses in order (Any).
+
+    With ranking 'count' the verses with the most matches come first,
+    otherwise those with the best BM25 score.  Either way, they are only
+    sorted as far as F4 goes through them.
+    """
+
+    found = [index.verse_spans([word], x1, x2) for word in liszt]
+    coordinates: dict[int, list] = {}
+    for by_verse in found:
+        for x_, spans in by_verse.items():
+            coordinates.setdefault(x_, []).extend(spans)
+    if ranking == 'count':
+        scores = {x_: len(i) for x_, i in coordinates.items()}
+    else:
+        scores = bm25(index, found, [len(_set[word]) for word in liszt])
+    verses = Ranking(scores)
+    return verses, Ranked(verses, coordinates)
 
 
 def prep_statusbar_message(index: int):
@@ -359,13 +432,15 @@ def prep_statusbar_message(index: int):
     occurrence = Info[index][2] + 1
     book_name = w.nwin[book]
 
-    if w.occurrence == w.occurring:
+    result = w.result
+    if result.current + 1 == result.total:
         end_message = "."
         w.no_f3_yet = 0
     else:
         end_message = '...'
+        w.no_f3_yet = 1
 
-    ye = f'Occurrence {w.occurrence}/{w.occurring} of "{w.keym}"'
+    ye = f'Occurrence {result.current + 1}/{result.total} of "{result.label}"'
 
     if book in onechapterbooks:
         w.message = f'{ye}  -  {book_name} {occurrence} KJV{end_message}'
@@ -374,116 +449,136 @@ def prep_statusbar_message(index: int):
 
 
 def occurrent1() -> int:
-    """Count occurrence(s) of w.key and give x_ and w.y values.
-
-    w.occurs is a list of all the x_ values in the search results.
-    w.occur is a corresponding list which gives the start w.y and finish w.yend of
-    the searched for item in the particular verse.
-    w.occurring is the total number of times the search key was found.
-    w.verse is the number of the items in the search list.
-    len(w.occur[w.verse]) is the number of search results in a particular verse.
-    w.finding is the number of items found within the verse.
+    """Go on to the next hit of w.result, and return its verse.
+
+    w.y and w.yend are set to where the hit is in the verse.  After the
+    last hit, the last is kept.
     """
 
-    x_ = w.occurs[-1]  # Workaround for PyCharm linter.
+    found = w.result.next()
+    if found is None:
+        return w.result.hit(w.result.current)[0]  # Last item
+    x_, w.y, w.yend = found
+    prep_statusbar_message(x_)
 
-    if w.verse < len(w.occurs):
-        w.finding += 1
-        x_ = w.occurs[w.verse]  # Aligns with w.occur(w.verse)
-        if w.finding + 1 <= len(w.occur[w.verse]):
-            w.y = w.occur[w.verse][w.finding][0]
-            w.yend = w.occur[w.verse][w.finding][1]
-            w.occurrence += 1
-            prep_statusbar_message(x_)
-        elif w.verse + 1 < len(w.occurs):
-            w.verse += 1
-            w.finding = 0
-            w.y = w.occur[w.verse][w.finding][0]
-            w.yend = w.occur[w.verse][w.finding][1]
-            w.occurrence += 1
-            x_ = w.occurs[w.verse]
-            prep_statusbar_message(x_)
-    elif w.verse >= len(w.occurs):
-        x_ = w.occurs[-1]  # Last item
+    return x_
 
-    # print(f'len(w.occurs = {len(w.occurs)})')
-    # print(f'w.occurring = {w.occurring}')
 
-    return x_
+def display_columns(x_: int, start: int, end: int, stripped: bool) -> tuple[int, int]:
+    """The columns of the display from start to end of verse x_.
 
+    start and end are offsets in Rstp if stripped, else in Rnew.
+    """
+
+    if stripped:
+        first = Ostp.place(x_, start)
+        end = Ostp.place(x_, end - 1) + 1 if end > start else first
+        start = first
+    return Okjv.place(x_, start), Okjv.place(x_, end)
+
+
+def matches_in(result: SearchResult, x_: int) -> list[tuple[int, int]]:
+    """The columns of the display of each match of result in verse x_."""
+
+    spans = result.spans_in(x_)
+    if spans is None:  # Raw, so look for them in the verse.
+        if result.scope is not None and not result.scope[0] <= x_ <= result.scope[1]:
+            return []
+        line = Rnew[x_] if result.checks[1] == 1 else Rlow[x_]
+        spans = []
+        i = line.find(result.key)
+        while i != -1 and result.key:
+            spans.append((i, i + len(result.key)))
+            # From the next character, as the matches counted may overlap.
+            i = line.find(result.key, i + 1)
+    stripped = result.checks[0] != 1
+    return [display_columns(x_, start, end, stripped) for start, end in spans]
+
+
+def findf3_ww_any(key: str, x1: int, x2: int, numwords: int, _set: PostingStore,
+                  index: PositionalIndex, ranking: str) -> tuple[Ranking, Ranked]:
+    """Match any word."""
 
-def punctuation_counter(text: str) -> int:
-    """Count the number of punctuation characters in text."""
+    liszt: list[str] = key.split(' ')[:numwords]
+    return rank_verses(liszt, x1, x2, _set, index, ranking)
 
-    p = "()[];:!<>,.-?"  # ’ not needed because in the search file.
-    num: int = 0
-    for _ in p:
-        k = text.count(_)
-        num += k
 
-    return num
+raw_index_lock = Lock()  # For use_raw_index, called on the GUI thread and the workers.
 
 
-def repeat_find(rx: str, start: int, end: int) -> int:
-    """Repeat find of lengthening text.
+def use_raw_index() -> None:
+    """Answer raw searches from the suffix arrays, once they are built.
 
-    rx is the verse from the PCE-find.txt file
-    or a similar file without italics.
+    The suffix arrays, in raw.abib, are next to the corpus bundle.
     """
 
-    flag: bool = True
-    numb: int
-    sumb: int = 0
-    repeats: int = 0
-    while flag is True:
-        text: str = rx[start:end + sumb]
-        numb = punctuation_counter(text)
-        sumb += numb
-        start = end + sumb - numb
-        repeats += 1
-        if repeats > 15 or numb == 0:
-            flag = False
-
-    return sumb
-
-
-def repeat_find_keyinc(rx: str, start: int, end: int) -> int:
-    """Repeat find of lengthening text.
-
-    rx is the verse from the PCE-find.txt file
-    or a similar file without italics."""
-
-    numb: int
-    sumb = 0
-    while True:
-        text: str = rx[start:end]
-        numb = punctuation_counter(text)
-        sumb += numb
-        if numb == 0:
-            break
-        start = end
-        end += numb
+    global raw_new, raw_low, raw_index_job  # Needed because of assignment.
+    with raw_index_lock:
+        if isinstance(raw_new, SuffixArray):
+            return
+        if raw_index_job is not None:
+            if raw_index_job.is_alive():
+                return
+            raw_index_job = None
+        if bundle.in_memory:
+            return
+        index = load_raw_index(bundle_dir)
+        if index is not None:
+            raw_new = SuffixArray(raw_new, index.array('Snew'))
+            raw_low = SuffixArray(raw_low, index.array('Slow'))
 
-    return sumb
 
+def chapter_bounds() -> list[int]:
+    """The first line of each chapter of KJB_PCE.txt, with its titles."""
+    return [0] + [Amap[x - 1] + 1 for x in range(1, len(Amap)) if Info.verses[x] == 0]
 
-def findf3_ww_any(x1: int, x2: int, numwords: int, _set: dict[str, set], r_list: list) -> None:
-    """Match any word."""
 
-    liszt: list[str] = w.key.split(' ')
-    s: set = set()
-    s = s.union(_set[liszt[0]], _set[liszt[1]])
-    if numwords > 2:
-        for i in range(2, numwords):
-            s = s.union(_set[liszt[i]])
-    w.occur = sorted(list(s))
-    w.occurs = []
-    for i in w.occur:
-        if i < x1 or i > x2:
-            continue
-        w.occurs.append(i)
+def load_search_data(job: "LoadJob") -> None:
+    """Load what searches need, in the background, once the Bible is shown.
 
-    check_count_sort(liszt, r_list)
+    Each step is reported to job as it starts.
+    """
+
+    global stripped_dict, strpd_low_dict, set_dict, set_lowdict, Rnew, Rlow, Rstp, Rlsp
+    global raw_new, raw_low, stp_index, lsp_index, Ostp, Okjv, sme_data
+
+    job.step('word lists')
+    stripped_dict = bundle.words('stripped_dict')
+    strpd_low_dict = bundle.words('strpd_low_dict')
+    # For each word, the set of verses in which it occurs.
+    set_dict = bundle.posting_store('stripped_dict')
+    set_lowdict = bundle.posting_store('strpd_low_dict')
+
+    job.step('find text')
+    Rnew = bundle.lines('Rnew').lines()  # PCE-find.txt
+    Rlow = bundle.lines('Rlow').lines()  # PCE-lower.txt
+
+    job.step('raw index')
+    # Rnew and Rlow as single strings, for raw searches and F4.  Once
+    # their suffix arrays are built, those answer the raw searches.
+    raw_new = RawText(Rnew)
+    raw_low = RawText(Rlow)
+    use_raw_index()
+
+    job.step('stripped text')
+    Rstp = bundle.lines('Rstp').lines()  # PCE-stripped.txt
+    Rlsp = bundle.lines('Rlsp').lines()  # PCE-stripped_lower.txt
+
+    job.step('word index')
+    # Positional indices of the words of Rstp and Rlsp.  See search.py.
+    stp_index = bundle.positional_index('Pstp')
+    lsp_index = bundle.positional_index('Plsp')
+    # From the offsets of Rstp to those of Rnew, and from those of Rnew to
+    # the columns of KJV.  See OffsetMap.
+    Ostp = bundle.offset_map('Ostp')
+    Okjv = bundle.offset_map('Okjv')
+
+    job.step('Morning and Evening')
+    try:
+        with open("morning_evening.json", "r", encoding="utf-8") as file:
+            sme_data = load(file)  # Load JSON data
+    except JSONDecodeError as e:
+        print(f"JSON file is invalid: {e}")
 
 
 def make_offset(ln: int) -> int:
@@ -516,68 +611,15 @@ def reset_attributes() -> None:
     """Instance attribute resetting routine."""
 
     # print('reset_attributes')
-    # w.gent = None
     w.y = 0
     w.hiLita.lineinc = 0
     w.hiLita.keyinc = 0
-    w.occurring = 0
-    w.occurrence = 0
-    w.key = ' '
+    w.hiLita.key = ' '
+    w.result = None
+    w.paint_matches()
     w.message = ''
     if w.dlg is not None:
         w.dlg.checks = [1, 0, 5]  # Is this necessary?
-    w.occurs = []
-    w.occur = []
-
-
-def readio(input_path: str, input_filename: str, file_length: int) -> list:
-    """Read Bible files."""
-
-    # print('readio ', input_filename)
-    output_listname: list = []
-    f_readio = open(f'{input_path}{input_filename}', 'r', encoding="utf-8")
-    for _ in range(file_length):
-        x5: str = f_readio.readline()
-        i = f'{x5.splitlines()[0]}\n'
-        output_listname.append(i)
-    f_readio.close()
-
-    return output_listname
-
-
-def load_json_dict(file_dict: Any) -> Any:
-    """Load a dictionary with JSON."""
-
-    # print('load_json_dict ', file_dict)
-    with open(file_dict, "r", encoding='utf-8') as read_file:
-        file1 = load(read_file)
-
-    return file1
-
-
-def load_list_set_dict(input_filename: str, ref_dict: Any) -> dict[Any, set]:
-    """Load a list_dict.txt/json file that is a dictionary of Bible words.
-
-    As keys and values, lists of verse numbers of the Bible.
-
-    The lists are converted to sets after reading, to return them to the
-    format required for use. The ref_dict is used to get the relevant keys.
-
-    The reason for this is that apparently JSON cannot deal with sets.
-
-    The input_filename will be of the form 'list_[name].txt/json'.
-    The receiving files name should be of the form 'set_[name]'.
-    """
-
-    # print('load_list_set_dict ', input_filename)
-    setdict: dict[Any, set] = {}
-    listdict: Any = load_json_dict(input_filename)
-    sd: list = list(ref_dict)
-    lsd: int = len(sd)
-    for n in range(lsd):
-        setdict[sd[n]] = set(listdict[sd[n]])
-
-    return setdict
 
 
 def is_float_re(string_: str) -> bool:
@@ -592,7 +634,7 @@ def is_float_re(string_: str) -> bool:
     return m is not None  # More Pythonic than `return True if m else False`
 
 
-def any_of_the_words_lookup(_key: str, _set: dict[str, set]) -> tuple[int, str]:
+def any_of_the_words_lookup(_key: str, _set: PostingStore) -> tuple[int, str]:
     """Takes _key and splits it into separate words in liszt,
     which are then looked up in the set of Bible words.
     Returns modified _key and count in num of occurrences of the words in it."""
@@ -618,6 +660,19 @@ def centerer(widt: int, heigh: int) -> tuple:
     return w_origin, h_origin
 
 
+def startup_progress(message: str) -> None:
+    """Show a step of startup on the splash screen, with the time so far."""
+
+    elapsed = (time.perf_counter() - started) * 1000
+    if settings.get('report_timings', False):
+        print(f'{elapsed:6.0f} ms  {message}')
+    if splash is not None:
+        splash.showMessage(f'{message}  ({elapsed:.0f} ms)',
+                           QtCore.Qt.AlignmentFlag.AlignBottom | QtCore.Qt.AlignmentFlag.AlignHCenter,
+                           QtGui.QColor('white'))
+        QApplication.processEvents()
+
+
 def format_status_message(q1, q2, q3):
     """Helper to format a message based on conditions."""
 
@@ -692,7 +747,12 @@ def load_settings_from_file(filename="settings.json"):
     # Default settings
     default_settings = {
         "theme": "Light",
-        "show_splash": False
+        "show_splash": False,
+        "regex_time_limit": 10,     # Seconds a regex search may run.
+        "regex_max_hits": 100000,   # Matches after which it stops.
+        "find_cache_mb": 64,        # Memory for the results of recent searches.
+        "any_ranking": "bm25",      # Any of the words order: "bm25" or "count".
+        "report_timings": False     # Print how long startup and each find take.
     }
 
     # Check if the file exists
@@ -832,8 +892,8 @@ def convert_roman_to_numeric(reference_text):
         roman_numeral = matched.group(0)
         try:
             # Use `fromRoman` to convert Roman numeral to an integer
-            return str(fromRoman(roman_numeral))
-        except InvalidRomanNumeralError:
+            return str(roman.fromRoman(roman_numeral))
+        except roman.InvalidRomanNumeralError:
             # In case of invalid Roman numerals, return the original text
             return roman_numeral
 
@@ -1086,7 +1146,7 @@ def resolve_reference(bits: list) -> tuple:
     if len(bits) > 1:
         if isRoman(bits[1]):  # If it's a Roman numeral
             # print(f"Chapter is Roman: {bits[1]}")
-            chapter = fromRoman(bits[1].upper())  # Convert Roman numeral
+            chapter = roman.fromRoman(bits[1].upper())  # Convert Roman numeral
         else:  # Otherwise, try parsing it as an integer
             try:
                 chapter = int(bits[1])
@@ -1102,7 +1162,7 @@ def resolve_reference(bits: list) -> tuple:
     if len(bits) > 2:
         if isRoman(bits[2]):  # If it's a Roman numeral
             # print(f"Verse is Roman: {bits[2]}")
-            verse = fromRoman(bits[2].upper())  # Convert Roman numeral
+            verse = roman.fromRoman(bits[2].upper())  # Convert Roman numeral
         else:  # Otherwise, try parsing it as an integer
             try:
                 verse = int(bits[2])
@@ -1171,6 +1231,119 @@ class AboutWindow(QtWidgets.QMainWindow):
         return self.content
 
 
+class FindSignals(QtCore.QObject):
+    """The signals by which a FindJob reports to the GUI thread."""
+
+    first_hit = QtCore.Signal(int)   # The first verse found.
+    progress = QtCore.Signal(int)    # The number of occurrences found so far.
+    done = QtCore.Signal()
+
+
+class FindJob(QtCore.QRunnable):
+    """Run the search part of a find on a worker thread.
+
+    The search makes a SearchResult, job.result.  Only one runs at a time,
+    as they share the regex pool.  Setting cancelled stops a search early,
+    when a newer one replaces it.  Only a regex search, which scans the
+    text, reports its hits as it goes; the others are answered from the
+    indices in one step, and only signal done.
+    """
+
+    lock = Lock()
+
+    def __init__(self, search) -> None:
+        super().__init__()
+        self.signals = FindSignals()
+        self.search = search
+        self.cancelled = False
+        self.result: Any = None
+        self.error = ''
+        self.limit = ''     # Why a search stopped short, if it did.
+        self.hits = 0
+
+    def run(self) -> None:
+        """Run the search, then signal done."""
+
+        try:
+            with FindJob.lock:
+                if not self.cancelled:
+                    self.result = self.search(self)
+        except re.error:
+            self.error = 'Regular Expression Error.'
+        except SearchLimit as err:
+            self.limit = str(err)
+        except Exception as err:    # As a repeat too big to compile, or a worker's error.
+            self.error = f'Search failed: {err}'
+        finally:
+            # Always, or find_job would stay set and F4 stay disabled.
+            self.signals.done.emit()
+
+    def found(self, x_: int, occurring: int) -> None:
+        """Report verse x_ found, with occurring occurrences so far."""
+
+        self.hits += 1
+        if self.hits == 1:
+            self.signals.first_hit.emit(x_)
+        elif self.hits % 256 == 0:
+            self.signals.progress.emit(occurring)
+
+
+class LoadSignals(QtCore.QObject):
+    """The signals by which a LoadJob reports to the GUI thread."""
+
+    progress = QtCore.Signal(str)    # The step begun.
+    done = QtCore.Signal()
+
+
+class LoadJob(QtCore.QRunnable):
+    """Run load(job), as load_search_data, on a worker thread.
+
+    future is done when it has, and holds any exception it raised.
+    steps counts the steps reported so far.
+    """
+
+    STEPS = 6  # Those of load_search_data.
+
+    def __init__(self, load) -> None:
+        super().__init__()
+        self.signals = LoadSignals()
+        self.load = load
+        self.future: Future = Future()
+        self.steps = 0
+
+    def run(self) -> None:
+        """Load, then signal done."""
+
+        try:
+            self.load(self)
+        except Exception as err:
+            self.future.set_exception(err)
+        else:
+            self.future.set_result(None)
+        self.signals.done.emit()
+
+    def step(self, name: str) -> None:
+        """Report the step begun."""
+
+        self.steps += 1
+        self.signals.progress.emit(f'{self.steps}/{self.STEPS} {name}')
+
+
+class FirstPaint(QtCore.QObject):
+    """Call then() once, after widget is first painted."""
+
+    def __init__(self, widget: QtWidgets.QWidget, then) -> None:
+        super().__init__(widget)
+        self.then = then
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() == QtCore.QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            QtCore.QTimer.singleShot(0, self.then)  # Once the paint is done.
+        return False
+
+
 class MainWindow(QtWidgets.QMainWindow):
     """MainWindow class."""
 
@@ -1206,7 +1379,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self.statusBar: None = None
         self.okButton: None = None
         self.dlg: None = None  # No external window yet.
-        self.gent: None = None
+        self.find_job: FindJob | None = None  # The search in progress.
+        self.find_started = 0.0  # When the last find began, for report_timings.
+        self.load_job: LoadJob | None = None  # Loads the search data.  See first_painted.
+        self.after_load = None  # What to do once it has.
+        self.first_paint_ms = 0.0  # From the start, once the Bible is shown.
         self.textEditor: QPlainTextEdit = QtWidgets.QPlainTextEdit()
         # Store a reference to the secondary window to manage its lifecycle
         self.secondary_window = None
@@ -1259,6 +1436,7 @@ class MainWindow(QtWidgets.QMainWindow):
         fixedfont: QFont = QtGui.QFont("Cascadia Mono", self.fontsize, QtGui.QFont.Weight.Medium)
         self.textEditor.setFont(fixedfont)
         self.textEditor.setReadOnly(True)
+        self.reader: ChapterWindow = ChapterWindow(self.textEditor)
 
         self.display_verse_input: QLineEdit = QtWidgets.QLineEdit()
         self.display_verse_input.setToolTip("F2 Enter or OK to search for a verse.")
@@ -1282,6 +1460,20 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.hiLita: SyntaxHighlighter = SyntaxHighlighter(self.textEditor.document())
 
+        # The other matches of the last find, marked where they are on screen.
+        self.match_format: QTextCharFormat = QtGui.QTextCharFormat()
+        self.match_format.setBackground(QtGui.QColor("#ffe680"))
+        self.match_format.setForeground(QtGui.QColor("#000000"))
+        self._painting_matches = False  # See paint_matches.
+        # The view scrolls from inside Qt, as when the cursor is set, so
+        # the matches are marked once it is done.
+        self.match_timer = QtCore.QTimer(self)
+        self.match_timer.setSingleShot(True)
+        self.match_timer.timeout.connect(self.paint_matches)
+        scrollbar = self.textEditor.verticalScrollBar()
+        scrollbar.valueChanged.connect(lambda _: self.scrolled())
+        scrollbar.rangeChanged.connect(lambda *_: self.match_timer.start(0))
+
         grid: QGridLayout = QtWidgets.QGridLayout()
         grid.setSpacing(2)
         self.setLayout(grid)
@@ -1330,7 +1522,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.buttonf4.setStyleSheet("QPushButton { text-align: left; }")
         self.buttonf4.clicked.connect(self.f4)
         self.buttonf4.setFocusPolicy(QtCore.Qt.FocusPolicy.NoFocus)
-        self.buttonf4.setToolTip("F4")
+        self.buttonf4.setToolTip("F4, or Shift+F4 for the previous")
         find_buttons_layout.addWidget(self.buttonf4)
 
         # Add the horizontal layout to the grid at row 3, column 0
@@ -1597,6 +1789,8 @@ class MainWindow(QtWidgets.QMainWindow):
         """Launch the Find dialog box."""
 
         self.reload()  # Reload KJB_PCE.txt if another file loaded.
+        if not self.search_loaded(self.onFindBtnClicked):
+            return
 
         if self.dlg is None:
             self.dlg = FindDialog(self)
@@ -1607,12 +1801,63 @@ class MainWindow(QtWidgets.QMainWindow):
     def show_find_window(self) -> None:
         """Show the Find window."""
 
+        if not self.search_loaded(self.show_find_window):
+            return
         if self.dlg is None:
             self.dlg = FindDialog(self)
             self.dlg.show()
         else:
             self.dlg.show()
 
+    def first_painted(self) -> None:
+        """Once the Bible is shown, load the search data in the background."""
+
+        self.first_paint_ms = (time.perf_counter() - started) * 1000
+        if self.settings.get('report_timings', False):
+            print(f'Time to first paint: {self.first_paint_ms:.0f} ms')
+        if splash is not None:
+            splash.finish(self)
+        job = LoadJob(load_search_data)
+        job.signals.progress.connect(self.load_progress)
+        job.signals.done.connect(self.load_done)
+        self.load_job = job
+        QtCore.QThreadPool.globalInstance().start(job)
+
+    def search_loaded(self, then) -> bool:
+        """Whether the search data is loaded.  If not, do then() once it is.
+
+        If loading failed, say so again; then() is never done.
+        """
+
+        if self.load_job is not None and self.load_job.future.done():
+            if self.load_job.future.exception() is None:
+                return True
+            self.on_error('Search indices failed to load.', 3000, True)
+            return False
+        self.after_load = then
+        self.statusBar.showMessage('Loading the search indices...')
+        return False
+
+    def load_progress(self, step: str) -> None:
+        """Show the step reached, if something waits for the search data."""
+
+        if self.after_load is not None:
+            self.statusBar.showMessage(f'Loading the search indices... {step}')
+
+    def load_done(self) -> None:
+        """Do what waited for the search data."""
+
+        then, self.after_load = self.after_load, None
+        err = self.load_job.future.exception()
+        if self.settings.get('report_timings', False):
+            print(f'Search data loaded: {(time.perf_counter() - started) * 1000:.0f} ms')
+        if err is not None:
+            print(f'Loading the search indices failed: {err!r}')
+            self.on_error('Search indices failed to load.', 3000, True)
+        elif then is not None:
+            self.statusBar.clearMessage()
+            then()
+
     def close_find_window(self) -> None:
         """Close Find window."""
 
@@ -1632,15 +1877,13 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.display_verse_input.setFocus()
 
-        if self.dlg.checks[0] != 1 or self.dlg.checks[2] == 6:
-            self.find_f4_alt()
-        elif self.dlg.checks[0] == 1:
-            if self.gent is None:
-                self.f3()
-            else:
-                self.find_f4()
+        if w.result is None:
+            self.f3()
+        else:
+            self.find_f4()
 
-    def make_key_whole(self, _key: str, _dict: dict, _set: dict[str, set]) -> tuple[int, str]:
+    def make_key_whole(self, _key: str, _dict: dict, _set: PostingStore,
+                       checks: tuple) -> tuple[int, str]:
         """Make _key conform to Match whole word only.
 
         Return the number of whole words in _key.
@@ -1654,368 +1897,314 @@ class MainWindow(QtWidgets.QMainWindow):
             _key += i + ' '
         _key = _key[:-1]  # Remove the last space character.
         num = len(words)
-        if num != numstart and (self.dlg.checks[0] == 2 or self.dlg.checks[1] == 3):
+        if num != numstart and (checks[0] == 2 or checks[1] == 3):
             # A word or part of a word was removed.
             num = 0
 
         return num, _key
 
-    def prepare_key_for_find(self) -> None:
+    def prepare_key_for_find(self, key: str) -> str:
         """Adjust key for searching in Rnew, which has no Unicode italics.
 
         It also has a different apostrophe and uses æ and Æ.
         """
 
-        p = "():,’;-?[].!<>"
-        ae: list[str] = ['aea', 'aeu', 'aes', 'aet', 'aene', 'aeno', 'AEno', 'AEne', 'Aeno', 'Aene']
-        ae_unicode: list[str] = ['æa', 'æu', 'æs', 'æt', 'æne', 'æno', 'Æno', 'Æne', 'Æno', 'Æne']
-        count = -1
-        for _ in ae:
-            count += 1
-            if _ in w.key:
-                index = w.key.find(_)
-                j = len(_)
-                j += index
-                w.key = w.key[:index] + ae_unicode[count] + w.key[j:]
-                break
-        line = ''
-        for _ in w.key:
-            if _ in p:
-                if _ == '-' and self.dlg.checks[0] != 1:
-                    continue
-                else:
-                    line += _
-                    continue
-            ch = ord(_)
-            if ch in range(119860, 119885):
-                ch -= 119795
-                line += chr(ch)
-            elif ch in range(119886, 119911):
-                ch -= 119789
-                line += chr(ch)
-            elif ch == 119997:
-                ch = 104
-                line += chr(ch)
-            elif ch == 39:
-                ch = 8217
-                line += chr(ch)
-            else:
-                line += _
-        w.key = line
+        return key_for_find(key, self.dlg.checks[0] == 1)
 
-    def findf3(self, x_start: int, x_end: int) -> None:
+    def findf3(self, key: str, x_start: int, x_end: int) -> None:
         """Find function."""
 
         #self.display_verse_input.setFocus()
+        self.find_started = time.perf_counter()
         x_ = self.get_line_number()
         savedx = x_
-        error_flag = False
+        if self.find_job is not None:
+            self.find_job.cancelled = True  # A newer search replaces it.
+            self.find_job = None
 
-        self.prepare_key_for_find()
+        key = self.prepare_key_for_find(key)
         x1 = book_bounds[x_start]
         x2 = book_bounds[x_end + 1] - 1
         x_ = x1
 
         w.no_f3_yet = 1
 
-        w.keym = w.key
-        if w.key == '' or w.key == ' ':
+        if key == '' or key == ' ':
             w.y = -1
             w.no_f3_yet = 0
-            w.occurring = 0
+            w.result = None
             self.statusBar.clearMessage()
             self.statusBar.repaint()
         else:
+            search = (self.find_query(key), x1, x2)
+            # The checks as they are now, as the dialog may change them
+            # while the search runs.
+            checks = search[0][1]
+            # A raw result is only a count, which can't be narrowed.
+            raw = checks[0] == 1 and checks[2] == 5
+            result = result_cache.get(*search, None if raw else SearchResult.narrow)
+            if result is not None:
+                w.y = 0
+                self.find_show(x1, savedx, key, result, '')
+                return
             self.statusBar.showMessage('Finding...')
             self.statusBar.repaint()
-            keylow = w.key.lower()
             w.y = 0
-            w.occurring = 0
-
-            if self.dlg.checks[2] == 6:
-                self.iterate_regex(Rnew, x1, x2)
-                if w.occurring != 0:
-                    w.y = w.occur[0][0][0]
-                    w.occurrence = 0
-                    w.verse = 0
-                    w.finding = -1
-                    x_ = occurrent1()
-                    self.statusBar.showMessage(w.message)
-                    self.statusBar.repaint()
-            else:
-                tv = self.dlg.checks[0] == 1   # Raw
-                if tv is not True:
-                    x_ = self.findf3_ww(x1, x2)
-                elif tv is True:
-                    # Raw.
-                    x_ = self.findf3_raw(x_, x1, x2, keylow)
-
-        if w.occurring == 0:
+            # Search off the GUI thread; find_done carries on from here.
+            job = FindJob(lambda job_: self.find_search(job_, key, x1, x2, checks))
+            job.signals.first_hit.connect(lambda x_: self.find_first_hit(job, x_))
+            job.signals.progress.connect(lambda n: self.find_progress(job, n))
+            job.signals.done.connect(lambda: self.find_done(job, search, x1, savedx, key))
+            self.find_job = job
+            QtCore.QThreadPool.globalInstance().start(job)
+            return
+
+        self.find_end(x_, savedx, key, False)
+
+    def find_query(self, key: str) -> tuple:
+        """The key and checks of the search, as result_cache knows them."""
+
+        checks = tuple(self.dlg.checks)
+        ranking = None
+        if checks[2] != 6:  # A regex is used as it is.
+            if checks[1] == 0:
+                key = key.lower()
+            if checks[0] != 1:
+                key = split_strip(key)[1]
+            if checks[0] == 4:
+                ranking = self.settings.get('any_ranking', 'bm25')
+
+        return key, checks, ranking
+
+    def find_search(self, job: "FindJob", key: str, x1: int, x2: int,
+                    checks: tuple) -> SearchResult:
+        """The search part of findf3, run by job on a worker thread.
+
+        checks are those of the Find dialog when it was started.
+        """
+
+        if checks[2] == 6:
+            result = self.iterate_regex(key, x1, x2, checks, job)
+        elif checks[0] == 1:   # Raw
+            result = self.findf3_raw(key, x1, x2, checks)
+        else:
+            result = self.findf3_ww(key, x1, x2, checks)
+        result.scope = (x1, x2)
+
+        return result
+
+    def find_first_hit(self, job: "FindJob", x_: int) -> None:
+        """Show the first verse found, while the search goes on."""
+
+        if job is self.find_job:
+            self.se_display_verse(x_)
+            self.statusBar.showMessage('Finding...')
+
+    def find_progress(self, job: "FindJob", occurring: int) -> None:
+        """Show how many have been found so far."""
+
+        if job is self.find_job:
+            self.statusBar.showMessage(f'Finding... {occurring}')
+
+    def find_done(self, job: "FindJob", search: tuple, x1: int, savedx: int, key: str) -> None:
+        """Show the results of a search, unless a newer one replaced it."""
+
+        if job is not self.find_job:
+            return
+        self.find_job = None
+        if job.error:
+            self.on_error(job.error, 2000, True)
+            return
+        result: SearchResult | None = job.result
+        if job.limit and not result:
+            self.on_error(job.limit, 2000, False)
+            return
+        if not job.limit:
+            # All of it was found, so it can answer the same search again.
+            result_cache.put(*search, result, result.size())
+        self.find_show(x1, savedx, key, result, job.limit)
+
+    def find_show(self, x1: int, savedx: int, key: str, result: SearchResult, limit: str) -> None:
+        """Go to the first hit of result, a search from verse x1."""
+
+        if self.settings.get('report_timings', False):
+            # With how the cache has answered, to help set find_cache_mb.
+            print(f'{(time.perf_counter() - self.find_started) * 1000:6.0f} ms  '
+                  f'Find "{result.label}"  {result_cache!r}')
+        w.result = result
+        w.hiLita.key = result.key
+        result.current = -1
+        x_ = x1
+        if result.total != 0:
+            x_ = occurrent1()
+            self.statusBar.showMessage(w.message)
+            self.statusBar.repaint()
+        self.find_end(x_, savedx, key, result.total == 0)
+        if limit:
+            # Say that these are only the matches found before it stopped.
+            self.statusBar.showMessage(f'{limit}  {w.message}')
+
+    def find_end(self, x_: int, savedx: int, key: str, error_flag: bool) -> None:
+        """Go to verse x_, the first found, or back to savedx if none was."""
+
+        if w.result is None or w.result.total == 0:
             x_ = savedx
             self.on_error('Not found...', 2000, True)
             error_flag = True
 
-        if w.key in ('q', 'Q'):
+        if key in ('q', 'Q'):
             self.display_verse_input.clear()
             exit()
         if error_flag is not True:
             self.goto_line_find(x_)
 
-    def iterate_regex(self, r: list, x1: int, x2: int) -> None:
-        """Iterate over R and find all the occurrences of key(s) in liszt."""
+    def iterate_regex(self, key: str, x1: int, x2: int, checks: tuple,
+                      job: "FindJob") -> SearchResult:
+        """Find all the occurrences of the regular expression key in Rnew.
 
-        w.occurring = 0
-        w.occur = []
-        w.occurs = []
-        if self.dlg.checks[1] == 1:             # Match case
-            pattern = rf"{w.key}"
-        else:
-            assert self.dlg.checks[1] == 0      # Ignore the case
-            pattern = rf"(?i){w.key}"
-        for _ in range(x1, x2):
-            coordinate = []
-            try:
-                for m in re.finditer(pattern, r[_]):
-                    w.occurring += 1
-                    coordinate.append((m.start(), m.end()))
-            except re.error:
-                msg = 'Regular Expression Error.'
-                self.on_error(msg, 2000, True)
-                w.occurring = 0
+        Each verse found is reported to job as it is found.  A bad
+        expression raises re.error.  One that could run for ever, or that
+        reaches the time or match limit in settings, raises SearchLimit;
+        the verses found by then are kept in job.result.
+        """
+
+        result = job.result = SearchResult(key, key, checks)
+        if nested_quantifier(key):
+            raise SearchLimit('Refused: a repeat inside a repeat, as (a+)+, can run for ever.')
+        pattern = compile_regex(key, checks[1] == 0)
+        words = regex_words(key)
+        verses = None
+        if words:
+            # Only the verses with every whole word of the pattern can match.
+            if pattern.flags & re.IGNORECASE:
+                verses = intersect([set_lowdict.get(i.lower(), x1, x2) for i in words])
+            else:
+                verses = intersect([set_dict.get(i, x1, x2) for i in words])
+        # The search runs in other processes, which can be stopped if it
+        # runs too long; a long scan is split between them, a few books each.
+        max_hits = self.settings.get('regex_max_hits', 0)
+        found = regex_pool.regex(key, checks[1] == 0, x1, x2, book_bounds,
+                                 verses, self.settings.get('regex_time_limit', 0),
+                                 lambda: job.cancelled)
+        for _, coordinate in found:
+            if job.cancelled:
                 break
-            if coordinate:
-                w.occur.append(coordinate)
-                w.occurs.append(_)
+            result.add(_, coordinate)
+            job.found(_, result.total)
+            if max_hits and result.total >= max_hits:
+                found.close()
+                raise SearchLimit(f'Regex search stopped at {result.total} matches.')
 
-    def findf3_raw(self, x_: int, x1: int, x2: int, keylow: str) -> int:
-        """Find Raw."""
+        return result
 
-        if self.dlg.checks[1] == 1:  # Match case
-            w.occurring += sum(Rnew[_].count(w.key) for _ in range(x1, x2))
-        elif self.dlg.checks[1] == 0:  # Lower case
-            w.occurring += sum(Rlow[_].count(keylow) for _ in range(x1, x2))
+    def findf3_raw(self, key: str, x1: int, x2: int, checks: tuple) -> SearchResult:
+        """Find Raw.  This runs in a FindJob; find_show shows the result.
 
-        if w.occurring != 0:
-            w.occurrence = 0
-            x_ = self.occurrent(x1, x2)
-            self.statusBar.showMessage(w.message)
-            self.statusBar.repaint()
+        Only the number of matches is found now.  Where they are is found
+        as F4 goes through them.
+        """
 
-        return x_
+        use_raw_index()
+        if checks[1] == 1:  # Match case
+            text, found = raw_new, key
+        else:  # Lower case
+            text, found = raw_low, key.lower()
+        return SearchResult(found, key, checks, total=text.count(found, x1, x2),
+                            hits=text.hits(found, x1, x2))
 
-    def assign_values(self) -> Any:
+    def assign_values(self, key: str, checks: tuple) -> Any:
         """Can't remember what this does."""
 
         # print('assign_values')
         numwords: int
-        w.verse = 0
-        if self.dlg.checks[1] == 1:             # Match case.
+        if checks[1] == 1:             # Match case.
             dic: Any = stripped_dict
-            key: str = w.key
-            # set_ and set_dict are dictionaries of words in the KJV Bible.
-            # For each word, there is a set of verse/line numbers where the word occurs.
-            set_: dict[Any, set] = set_dict
-            r_list: list | tuple = Rstp
+            # set_ and set_dict are the words in the KJV Bible.
+            # For each word, there is a sorted list of verse/line numbers where the word occurs.
+            set_: PostingStore = set_dict
+            index: PositionalIndex = stp_index
         else:
-            assert self.dlg.checks[1] == 0      # The Case isn't checked.
+            assert checks[1] == 0      # The Case isn't checked.
             dic = strpd_low_dict
-            key = w.key.lower()
+            key = key.lower()
             set_ = set_lowdict
-            r_list = Rlsp
-        numwords, w.key = self.make_key_whole(key, dic, set_)
-        w.keym = w.key  # 16/12/2024
+            index = lsp_index
+        numwords, key = self.make_key_whole(key, dic, set_, checks)
+
+        return numwords, key, set_, index
 
-        return numwords, set_, r_list
+    def findf3_ww(self, key: str, x1: int, x2: int, checks: tuple) -> SearchResult:
+        """Find Whole Words.
 
-    def findf3_ww(self, x1: int, x2: int) -> int:
-        """Find Whole Words."""
+        This runs in a FindJob; find_show then shows the result.  The hits
+        of an all or any of the words search are verses.
+        """
 
-        numwords, set_, r_list = self.assign_values()
-        x_: int = 0  # Pointer to the first verse with the searched for key.
+        numwords, key, set_, index = self.assign_values(key, checks)
+        label = key  # 16/12/2024
+        verses: Any = []
+        spans: Any = []
         if numwords == 1:
-            self.findf3_ww_1(x1, x2, set_, r_list)   # Match the whole single word.
-            if w.occurring != 0:
-                w.occurrence = 0
-                w.verse = 0
-                w.finding = -1
-                x_ = occurrent1()
-                self.statusBar.showMessage(w.message)
-                self.statusBar.repaint()
+            verses, spans = self.findf3_ww_1(key, x1, x2, set_, index, checks)  # Match the whole single word.
         elif numwords > 1:
-            if self.dlg.checks[0] == 2:
-                findf3_ww_ac(x1, x2, numwords, set_, r_list)
-            elif self.dlg.checks[0] == 3:
-                findf3_ww_all(x1, x2, numwords, set_, r_list)
-            elif self.dlg.checks[0] == 4:
-                numwords, w.key = any_of_the_words_lookup(w.key, set_)
-                findf3_ww_any(x1, x2, numwords, set_, r_list)
-            if w.occurring != 0:
-                if self.dlg.checks[0] != 2:     # Not whole words
-                    x_ = w.occurs[0]
-                    w.occurrence = 1
-                    prep_statusbar_message(x_)
-                elif self.dlg.checks[0] == 2:   # Whole words
-                    w.occurrence = 0
-                    w.verse = 0
-                    w.finding = -1
-                    x_ = occurrent1()
-                self.statusBar.showMessage(w.message)
-                self.statusBar.repaint()
-        else:
-            w.occurring = 0
-
-        return x_
-
-    def findf3_ww_1(self, x1: int, x2: int, _set: dict[str, set], r_list: list) -> None:
+            if checks[0] == 2:
+                verses, spans = findf3_ww_ac(key, x1, x2, numwords, index)
+            elif checks[0] == 3:
+                verses, spans = findf3_ww_all(key, x1, x2, numwords, set_, index)
+            elif checks[0] == 4:
+                numwords, key = any_of_the_words_lookup(key, set_)
+                verses, spans = findf3_ww_any(key, x1, x2, numwords, set_, index,
+                                              self.settings.get('any_ranking', 'bm25'))
+
+        return SearchResult(key, label, checks, verses, spans, by_verse=checks[0] > 2)
+
+    def findf3_ww_1(self, key: str, x1: int, x2: int, _set: PostingStore,
+                    index: PositionalIndex, checks: tuple) -> tuple[Any, Any]:
         """Match the whole single word."""
 
-        try:
-            w.occur = sorted(list(_set[w.key]))
-        except KeyError:
-            w.occurring = 0
-        else:
-            w.occurs = []
-            for i in w.occur:
-                if i < x1 or i > x2:
-                    continue
-                w.occurs.append(i)
-            # List of lists with tuple of the word positions, within the related verse.
-            liszt = [w.key]
-            if self.dlg.checks[0] == 4:
-                check_count_sort(liszt, r_list)
-            else:
-                iterate_list(liszt, r_list)
-
-            if self.dlg.checks[0] > 2:
-                w.occur_ww_1 = deepcopy(w.occur)
-                j = -1
-                for i in w.occur_ww_1:
-                    j += 1
-                    li = len(i)
-                    if li > 1:
-                        a = i[0][0]
-                        b = i[li-1][1]
-                        _ = w.occur_ww_1.pop(j)
-                        w.occur_ww_1.insert(j, [(a, b)])
-                w.occurring = len(w.occur_ww_1)   # 16/12/24
+        if key not in _set:
+            return [], []
         # List of verses containing the searched for item.
-        # Number of occurrences of the searchitem within the range x1 to x2.
-
-    def occurrent(self, x1: int, x2: int):
-        """Count occurrences of item searched for."""
-
-        if w.occurrence == 0:
-            self.gent = self.gen(w.key, x1, x2)
-        x_, w.y, w.occurrence = next(self.gent)
-        prep_statusbar_message(x_)
-
-        return x_
+        verses = restrict(_set[key], x1, x2)
+        if checks[0] == 4:
+            return rank_verses([key], x1, x2, _set, index, self.settings.get('any_ranking', 'bm25'))
+        # List of lists with tuple of the word positions, within the related verse.
+        return iterate_list([key], index, verses)
 
     def find_f4(self) -> None:
-        """Repeat find frontend for raw search."""
+        """Repeat find: go on to the next hit of w.result."""
 
-        if w.occurrence < w.occurring:
+        result = w.result
+        if result.current + 1 < result.total:
             x_ = self.get_line_number()
-
             if forward:
                 back_push(x_)
                 while forward:
                     b_ = forward.pop()
                     back.append(b_)
             else:
+                if result.current >= 0:
+                    x_ = result.hit(result.current)[0]
                 forward.clear()
                 back_push(x_)
 
-            # Ensure self.gent is a valid generator
-            if self.gent is None:
-                raise ValueError(
-                    "self.gent has not been initialized. It must be assigned a valid generator before calling find_f4.")
-
-            try:
-                x_, w.y, w.occurrence = next(self.gent)
-            except StopIteration:
-                # Handle generator exhaustion if needed
-                self.statusBar.showMessage("Search completed: no more matches.")
-                return
-
-            # Set status bar message and other UI updates.
-            prep_statusbar_message(x_)
+            x_ = occurrent1()
             self.statusBar.showMessage(w.message)
             self.statusBar.repaint()
             self.goto_line_find(x_)
 
-    def find_f4_alt(self) -> None:
-        """Repeat find frontend for Match whole words."""
-
-        if len(w.occurs) > 0 and w.occurrence < w.occurring:
-            x_ = self.get_line_number()
-            if forward:
-                back_push(x_)
-                while forward:
-                    b_ = forward.pop()
-                    back.append(b_)
-            else:
-                x_ = w.occurs[w.verse]
-                forward.clear()
-                back_push(x_)
-
-            if self.dlg.checks[0] == 2 or self.dlg.checks[2] == 6:
-                x_ = occurrent1()
-            elif self.dlg.checks[0] == 3 or self.dlg.checks[0] == 4:
-                if w.verse < len(w.occurs) - 1:
-                    w.verse += 1
-                    x_ = w.occurs[w.verse]
-                    w.occurrence += 1
-                    prep_statusbar_message(x_)
+    def find_previous(self) -> None:
+        """Go back to the previous hit of w.result (Shift+F4)."""
 
+        result = w.result
+        if result is not None and result.current > 0:
+            back_push(result.hit(result.current)[0])
+            x_, w.y, w.yend = result.previous()
+            prep_statusbar_message(x_)
             self.statusBar.showMessage(w.message)
             self.statusBar.repaint()
             self.goto_line_find(x_)
 
-    def gen(self, key: str, x1: int, x2: int):
-        """Return next position of the searched for key."""
-
-        x_ = -1
-        d1 = 0
-        if self.dlg.checks[1] == 1:
-            files_path = Path(current_directory) / "PCE-find.txt"
-        else:
-            assert self.dlg.checks[1] == 0
-            files_path = Path(current_directory) / "PCE-lower.txt"
-            key = key.lower()
-
-        # Debugging: Print the file path
-        # print(f"Constructed file path: {files_path}")
-
-        # Check if the file exists before opening it
-        if not files_path.exists():
-            # print(f"Error: File '{files_path}' not found.")
-            raise FileNotFoundError(f"File '{files_path}' does not exist.")
-
-        # Open and read the file line by line
-        try:
-            line = (z for z in files_path.open('r', encoding='utf-8'))
-        except FileNotFoundError as e2:
-            print(f"Error opening file: {e2}")
-            raise
-
-        while True:
-            x_ += 1
-            yt = 0
-            if x_ > x2:
-                break
-            a = next(line)
-            if x_ < x1:
-                continue
-            while key in a:
-                d1 += 1
-                w.y = int(a.find(key))
-                if w.y != -1:
-                    yt = yt + w.y + 1        #  Expected int got '() -> int' instead
-                    a = a[w.y + 1:]
-                    w.y = yt - 1
-                    yield x_, w.y, d1
-
     def goto_line_find(self, x_: int) -> None:
         """Find function - prepare for output."""
 
@@ -2023,106 +2212,32 @@ class MainWindow(QtWidgets.QMainWindow):
         self.adjust_highlighting(ln, x_)
         self.move_to_line(ln)
 
-    def stripped_punctuation_adjust(self, ln: int, x_: int, start: int, end: int, truth: bool) -> int:
-        """Addition for 'Match whole words only'.
-
-        This adjustment allows for no punctuation in the stripped search text.
-        """
-
-        add: int
-        if '¶ ' in KJV[ln] and truth is True:
-            w.y += 2
-            end = w.y
-        if self.dlg.checks[1] == 0:
-            add = repeat_find(Ldic[x_], start, end)
-        else:
-            add = repeat_find(Rdic[x_], start, end)
-        return add
-
-    def stripped_punctuation_adjust_ki(self, x_: int, start: int, end: int) -> int:
-        """Addition for 'Match whole words only'.
+    def adjust_highlighting(self, ln: int, _x: int) -> None:
+        """Place the highlight of the hit at w.y in the display line ln.
 
-        This adjustment allows for no punctuation in the stripped search text.
+        w.y is an offset in the find text for a Raw search, and in the
+        stripped text for the others.  Ostp and Okjv translate it, and the
+        end of the hit, into columns of the display, allowing for the
+        punctuation and the Unicode italics.
         """
 
-        add: int
-        if self.dlg.checks[1] == 0:
-            add = repeat_find_keyinc(Ldic[x_], start, end)
-        else:
-            add = repeat_find_keyinc(Rdic[x_], start, end)
-
-        return add
-
-    def adjust_highlighting(self, ln: int, _x: int) -> None:
-        """Adjust highlighting for longer length Unicode characters."""
-
-        add = 0
-        if self.dlg.checks[0] == 3 or self.dlg.checks[0] == 4:
-            w.occur[w.verse].sort(key=lambda _x: _x[0])
-            w.y = w.occur[w.verse][0][0]
-            lenoccur = len(w.occur[w.verse])
-            w.yend = w.occur[w.verse][lenoccur - 1][1]
-            w.key = Rstp[_x][w.y:w.yend]
-            lkey = len(w.key)
-        elif self.dlg.checks[2] == 6:
+        checks = w.result.checks  # As they were for the find.
+        if checks[0] == 3 or checks[0] == 4:
+            spans = sorted(w.result.current_spans(), key=lambda _x: _x[0])
+            w.y = spans[0][0]
+            w.yend = spans[-1][1]
+            w.hiLita.key = Rstp[_x][w.y:w.yend]
+            lkey = len(w.hiLita.key)
+        elif checks[2] == 6:
             lkey = w.yend - w.y
             w.hiLita.length = lkey
         else:
-            lkey = len(w.key)
-
-        if self.dlg.checks[0] != 1:
-            start = 0
-            assert isinstance(w.y, int)
-            end: int = w.y
-            add = self.stripped_punctuation_adjust(ln, _x, start, end, True)
-        lineinc = add
-
-        ignore = [8217]
-        litz = []
-        lr = len(KJV[ln])
-        for _ in range(lr):
-            unich = ord(KJV[ln][_])
-            if unich in ignore:
-                pass
-            elif unich > 230:
-                litz.append(_)
-        j = 0
-        for i in litz:
-            if i < w.y + add:
-                j += 1
-        lineinc += j
-        er = w.y + lkey
-        endof = er + add
-        w.hiLita.lineinc = lineinc
-        self.keyinc_section(endof, add, ln, _x)
-
-    def keyinc_section(self, endof: int, add: int, ln: int, x_: int) -> None:
-        """keyinc section."""
-
-        unich = 32
-        num = 0
-        ignore = [8217]
-        litz = []
+            lkey = len(w.hiLita.key)
+
         assert isinstance(w.y, int)
-        start = w.y + add
-        if self.dlg.checks[0] != 1:  # Not Raw
-            end = start + len(w.key)  # change w.yend
-            num = self.stripped_punctuation_adjust_ki(x_, start, end)
-        lav = len(KJV[ln])
-        if start > lav or endof > lav:
-            pass
-        else:
-            for i in range(start, endof + num):
-                try:
-                    unich = ord(KJV[ln][i])
-                except IndexError:
-                    pass
-                if unich in ignore:
-                    pass
-                elif unich > 230:
-                    litz.append(i)
-        keyinc = len(litz) + num
-        w.hiLita.keyinc = keyinc
+        start, end = display_columns(_x, w.y, w.y + lkey, checks[0] != 1)
+        w.hiLita.lineinc = start - w.y
+        w.hiLita.keyinc = end - start - lkey
 
     def display_verse(self, x_: int) -> None:
         """Display Bible text in textEditor."""
@@ -2142,17 +2257,58 @@ class MainWindow(QtWidgets.QMainWindow):
         """Display engine."""
 
         # print('move_to_line')
-        self.textEditor.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
         self.on_text_changed(ln)
-        ln = make_offset(ln)
-        linecursor = QtGui.QTextCursor(
-            self.textEditor.document().findBlockByLineNumber(ln))
-        self.textEditor.moveCursor(QtGui.QTextCursor.MoveOperation.End)
-        self.textEditor.setTextCursor(linecursor)
-        self.textEditor.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.WidgetWidth)
-        if self.dlg is not None:
-            if self.dlg.checks[0] == 3 or self.dlg.checks[0] == 4:
-                w.key = w.store
+        self.reader.scroll_to(make_offset(ln))
+        self.paint_matches()
+
+    def scrolled(self) -> None:
+        """Keep the chapters about the view in the document, and mark the matches in view."""
+
+        while self.reader.follow():
+            pass
+        self.match_timer.start(0)
+
+    def paint_matches(self) -> None:
+        """Mark every match of w.result in the blocks on screen.
+
+        Only the blocks in view are looked at, so the matches elsewhere
+        cost nothing.  This runs again whenever the view scrolls.  Setting
+        the selections may scroll the view, but Qt can't have them set
+        again while it is doing so, so that call does nothing.
+        """
+
+        if self._painting_matches:
+            self.match_timer.start(0)  # For the view it leaves.
+            return
+        self._painting_matches = True
+        try:
+            self._paint_matches()
+        finally:
+            self._painting_matches = False
+
+    def _paint_matches(self) -> None:
+        result = w.result
+        selections = []
+        if result is not None and result.total:
+            editor = self.textEditor
+            block = editor.cursorForPosition(QtCore.QPoint(0, 0)).block()
+            last = editor.cursorForPosition(
+                QtCore.QPoint(0, editor.viewport().height() - 1)).blockNumber()
+            while block.isValid() and block.blockNumber() <= last:
+                ln = self.reader.line(block.blockNumber())
+                if ln in Amap:
+                    x_ = Amap.index(ln)
+                    for start, end in matches_in(result, x_):
+                        cursor = QtGui.QTextCursor(block)
+                        cursor.setPosition(block.position() + start)
+                        cursor.setPosition(block.position() + end,
+                                           QtGui.QTextCursor.MoveMode.KeepAnchor)
+                        selection = QtWidgets.QTextEdit.ExtraSelection()
+                        selection.cursor = cursor
+                        selection.format = self.match_format
+                        selections.append(selection)
+                block = block.next()
+        self.textEditor.setExtraSelections(selections)
 
     def on_text_changed(self, ln: int) -> None:
         """Highlighting."""
@@ -2165,22 +2321,10 @@ class MainWindow(QtWidgets.QMainWindow):
         w.hiLita.clear = True
         w.hiLita.clear_highlight()
 
-        try:
-            if self.dlg is not None:
-                if self.dlg.checks[0] == 3 or self.dlg.checks[0] == 4:
-                    w.store = w.key
-                    w.hiLita.clear = False
-                    keys = sorted(w.occur[w.verse])
-                    x_ = Amap.index(ln)
-                    for i in keys:
-                        w.key = '+' * (i[1] - i[0])
-                        w.y = i[0]
-                        self.adjust_highlighting(ln, x_)
-
-            w.hiLita.setFormat(w.hiLita.position, w.hiLita.length, fmt)
-            w.hiLita.highlight_line(ln, fmt)
-        except ValueError:
-            pass
+        # The matches in the verse are marked by paint_matches; this is the
+        # hit being looked at.
+        w.hiLita.setFormat(w.hiLita.position, w.hiLita.length, fmt)
+        w.hiLita.highlight_line(ln, fmt)
 
     def se_display_verse(self, x_: int) -> None:
         """Display Bible text in textEditor after back or forward pop."""
@@ -2189,7 +2333,6 @@ class MainWindow(QtWidgets.QMainWindow):
         if x_ in starts_with_italics:  # Verses that start with italics.
             w.hiLita.keyinc = 1
 
-        self.textEditor.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
         fmt = QtGui.QTextCharFormat()
         fmt.setBackground(QtGui.QColor(linehighlightcolor))
         fmt.setForeground(QtGui.QColor(linetextcolor))
@@ -2197,12 +2340,8 @@ class MainWindow(QtWidgets.QMainWindow):
         w.hiLita.clear_highlight()
         w.hiLita.setFormat(w.hiLita.position, w.hiLita.length, fmt)
         w.hiLita.highlight_line(ln, fmt)
-        ln = make_offset(ln)
-        linecursor = QtGui.QTextCursor(
-            self.textEditor.document().findBlockByLineNumber(ln))
-        self.textEditor.moveCursor(QtGui.QTextCursor.MoveOperation.End)
-        self.textEditor.setTextCursor(linecursor)
-        self.textEditor.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.WidgetWidth)
+        self.reader.scroll_to(make_offset(ln))
+        self.paint_matches()
         self.ref_to_statusbar(x_)
 
     def ref_to_statusbar(self, x_: int) -> None:
@@ -2250,11 +2389,7 @@ class MainWindow(QtWidgets.QMainWindow):
         back_push(x_)
         book: int = self.comboBox_1.currentIndex()
         # book is an index 0-65
-        if book == BOOKS_IN_THE_BIBLE - 1:
-            b = 22  # Number of chapters in Revelation
-        else:
-            a: int = Info.index([book + 1, 0, 0])
-            b: int = Info[a - 1][1] + 1  # No. of chapters in the book.
+        b: int = Info.chapter_count(book)  # No. of chapters in the book.
         w.nchapters = []
         for _ in range(1, b + 1):
             w.nchapters.append(str(_))
@@ -2281,19 +2416,7 @@ class MainWindow(QtWidgets.QMainWindow):
         reset_attributes()
         book: int = self.comboBox_1.currentIndex()
         chapter: int = self.comboBox_2.currentIndex()
-        if chapter == int(w.nchapters[-1]) - 1:
-            # No. of verses in the chapter.
-            if book == BOOKS_IN_THE_BIBLE - 1:
-                d = 21
-            else:
-                c: int = Info.index([book + 1, 0, 0]) - 1
-                d: int = Info[c][2] + 1
-        else:
-            try:
-                c = Info.index([book, chapter + 1, 0]) - 1
-            except ValueError:
-                c = Info.index([book + 1, 0, 0]) - 1
-            d = Info[c][2] + 1
+        d: int = Info.verse_count(book, chapter)  # No. of verses in the chapter.
         w.nverses = []
         for _ in range(1, d + 1):
             w.nverses.append(str(_))
@@ -2462,7 +2585,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """Calculate the absolute position of a verse from the current line.
            Only allows valid positions within the same chapter."""
 
-        inf: list = Info[current_line]
+        inf: tuple = Info[current_line]
         current_chapter: int = inf[1]
         # print(f"2474 current_chapter: {current_chapter}")
         current_verse = inf[2]
@@ -2519,22 +2642,11 @@ class MainWindow(QtWidgets.QMainWindow):
         """Find the line number of the verse at the top of the screen."""
 
         self.textEditor.moveCursor(QtGui.QTextCursor.MoveOperation.StartOfLine)
-        linenumber: int = self.textEditor.textCursor().blockNumber()
-        if linenumber in Amap:
-            x_: int = Amap.index(linenumber)
-        else:
-            if linenumber < Amap[0]:
-                x_ = 0
-            elif linenumber > KJB_PCE_LASTLINE - 118:
-                x_ = LAST_VERSE_IN_BIBLE
-            else:
-                for _ in range(10):
-                    if linenumber + _ in Amap:
-                        linenumber += _
-                        break
-                else:
-                    return LAST_VERSE_IN_BIBLE
-                x_ = Amap.index(linenumber)
+        linenumber: int = self.reader.line(self.textEditor.textCursor().blockNumber())
+        # The verse on this line, or the next verse if it is a title or a blank line.
+        x_: int = Amap.verse_at_or_after(linenumber)
+        if x_ > LAST_VERSE_IN_BIBLE:
+            x_ = LAST_VERSE_IN_BIBLE
 
         return x_
 
@@ -2571,7 +2683,10 @@ class MainWindow(QtWidgets.QMainWindow):
             QtCore.Qt.Key.Key_F12: self.f12,
             QtCore.Qt.Key.Key_Q: exit}
 
-        if event.key():
+        if event.key() == QtCore.Qt.Key.Key_F4 and \
+                event.modifiers() & QtCore.Qt.KeyboardModifier.ShiftModifier:
+            self.shift_f4()
+        elif event.key():
             try:
                 qtcore_keys_dict[event.key()]()
             except KeyError:
@@ -2599,12 +2714,20 @@ class MainWindow(QtWidgets.QMainWindow):
         """Find next key F4."""
 
         self.reload()  # Reload KJB_PCE.txt if another file loaded.
-        if w.key == ' ' or w.no_f3_yet == 0:
+        if w.result is None or w.no_f3_yet == 0 or self.find_job is not None:
             pass
         else:
             self.textEditor.setFocus()
             self.find_next()
 
+    def shift_f4(self) -> None:
+        """Find previous key Shift+F4."""
+
+        self.reload()  # Reload KJB_PCE.txt if another file loaded.
+        if w.result is not None and self.find_job is None:
+            self.textEditor.setFocus()
+            self.find_previous()
+
     def f5(self) -> None:
         """Back key."""
 
@@ -2657,7 +2780,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if newbook < 0:
             self.on_error('No earlier book!', 3000, True)
         else:
-            x_ = Info.index([newbook, 0, 0])
+            x_ = Info.book_start(newbook)
             forward.clear()
             back_push(x_)
             self.display_verse(x_)
@@ -2673,7 +2796,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if newbook > BOOKS_IN_THE_BIBLE - 1:
             self.on_error('No later book!', 3000, True)
         else:
-            x_ = Info.index([newbook, 0, 0])
+            x_ = Info.book_start(newbook)
             forward.clear()
             back_push(x_)
             self.display_verse(x_)
@@ -2692,14 +2815,9 @@ class MainWindow(QtWidgets.QMainWindow):
             if newbook < 0:
                 self.on_error('No earlier chapter!', 3000, True)
                 return
-            while True:
-                if Info[x_][0] == book:
-                    x_ -= 1
-                else:
-                    break
-            newchapter = Info[x_][1]
+            newchapter = Info.chapter_count(newbook) - 1
             book = newbook
-        x_ = Info.index([book, newchapter, 0])
+        x_ = Info.chapter_start(book, newchapter)
         forward.clear()
         back_push(x_)
         self.display_verse(x_)
@@ -2713,21 +2831,14 @@ class MainWindow(QtWidgets.QMainWindow):
         book: int = Info[x_][0]
         chapter: int = Info[x_][1]
         newchapter: int = chapter + 1
-        try:
-            x_ = Info.index([book, newchapter, 0])
-        except ValueError:
+        if newchapter == Info.chapter_count(book):
             newbook: int = book + 1
             if newbook > BOOKS_IN_THE_BIBLE - 1:
                 self.on_error('No later chapter!', 3000, True)
                 return
-            while True:
-                if Info[x_][0] == book:
-                    x_ += 1
-                else:
-                    break
-            newchapter = Info[x_][1]
+            newchapter = 0
             book = newbook
-        x_ = Info.index([book, newchapter, 0])
+        x_ = Info.chapter_start(book, newchapter)
         forward.clear()
         back_push(x_)
         self.display_verse(x_)
@@ -2749,14 +2860,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def beep(self, x_: int, lm: float) -> None:
         """Makes a beep sound, and clears the message."""
 
-        # Initialize Pygame's mixer
-        mixer.init()
-
-        # Load your sound effect file (e.g., 'sound.wav')
-        beep_sound = mixer.Sound('sound.mp3')
-        beep_sound.set_volume(0.5)  # Set volume to 50%
-
-        # Play the sound effect
+        # Play the sound effect, loaded the first time.  See load_beep.
         beep_sound.play()
 
         self.statusBar.repaint()
@@ -2787,38 +2891,36 @@ class MainWindow(QtWidgets.QMainWindow):
                 self, "Open file", "",
                 "Text documents (*.txt);All files (*.*)")
             # print(path1, ' Opened')
-        if path1:
+        if path1[-11:] == r'KJB_PCE.txt':
+            # The Bible, less the notice of copyright, is in the corpus
+            # bundle already, so the file isn't read again.
+            self.path1 = path1
+            # Only the chapters being read are put in the editor.  See ChapterWindow.
+            self.reader.open(bundle.lines('KJV').split(), chapter_bounds())
+            self.update_title()
+            w.otherFileFlag = False
+            self.display_verse(0)
+        elif path1:
             try:
                 with open(path1, "r", encoding="utf-8") as f_open:
-                    w.PCE_text = f_open.read()
+                    text = f_open.read()
             except Exception as e3:
                 self.dialog_critical(str(e3))
             else:
                 self.path1 = path1
-                if path1[-11:] == r'KJB_PCE.txt':
-                    # _ = '****END OF THE NOTICE OF COPYRIGHT****'
-                    length_of_copyright_notice: int = w.PCE_text.find(EOTNOC)
-                    if length_of_copyright_notice == -1:
-                        print('Failed to find the line ', EOTNOC)
-                        print('Cannot continue until this is put right.')
-                        exit()
-                    total_length: int = length_of_copyright_notice + len(EOTNOC) + 1
-                    w.PCE_text = w.PCE_text[total_length:]
-                self.textEditor.setPlainText(w.PCE_text)
+                self.reader.open(text.split('\n'))
                 self.update_title()
-
-                if path1[-11:] == r'KJB_PCE.txt':
-                    w.otherFileFlag = False
-                    self.display_verse(0)
-                else:
-                    w.otherFileFlag = True
+                w.otherFileFlag = True
 
     def file_print(self) -> None:
         """File print routine."""
 
-        dlg: QPrintDialog = QtPrintSupport.QPrintDialog()
+        dlg = QtPrintSupport.QPrintDialog()
         if dlg.exec_():
-            self.textEditor.print_(dlg.printer())
+            # All of the file, not just the chapters in the editor.
+            document = QtGui.QTextDocument('\n'.join(self.reader.lines))
+            document.setDefaultFont(self.textEditor.font())
+            document.print_(dlg.printer())
 
     def update_title(self) -> None:
         """Title update routine."""
@@ -2834,11 +2936,14 @@ class MainWindow(QtWidgets.QMainWindow):
         # Populate the settings dialog with current settings
         dialog.splash_checkbox.setChecked(self.settings.get("show_splash", False))
         dialog.theme_combobox.setCurrentText(self.settings.get("theme", "Light"))
+        dialog.ranking_combobox.setCurrentIndex(
+            list(RANKINGS).index(self.settings.get("any_ranking", "bm25")))
 
         if dialog.exec():  # If the dialog is accepted (OK button).
             # Get settings from the dialog and explicitly set show_splash
             self.settings["theme"] = dialog.theme_combobox.currentText()  # Ensure the theme is updated
             self.settings["show_splash"] = dialog.splash_checkbox.isChecked()  # Ensure splash checkbox updates settings
+            self.settings["any_ranking"] = list(RANKINGS)[dialog.ranking_combobox.currentIndex()]
 
             # DEBUG: Print settings before saving
             # print("Settings before saving:", self.settings)
@@ -2870,6 +2975,8 @@ class MainWindow(QtWidgets.QMainWindow):
         Creates and displays the secondary window to show SME text.
         Ensures the secondary window is non-blocking.
         """
+        if not self.search_loaded(lambda: self.display_secondary_window(offset)):
+            return
         # Get the SME text (from the sme method)
         try:
             sme_text = self.sme(offset)
@@ -3088,6 +3195,12 @@ class SettingsDialog(QtWidgets.QDialog):
         self.theme_combobox.addItems(["Light", "Dark"])
         self.layout.addWidget(self.theme_combobox)
 
+        # Create the order of Any of the words results
+        self.layout.addWidget(QtWidgets.QLabel("Any of the words, in order of"))
+        self.ranking_combobox = QComboBox()
+        self.ranking_combobox.addItems(RANKINGS.values())
+        self.layout.addWidget(self.ranking_combobox)
+
         # Define the OK and Cancel buttons
         QOk = QDialogButtonBox.StandardButton.Ok
         QCancel = QDialogButtonBox.StandardButton.Cancel
@@ -3125,6 +3238,161 @@ class SettingsDialog(QtWidgets.QDialog):
         self.reject()  # Close the dialog, marking it as 'rejected'
 
 
+class ChapterWindow:
+    """The lines of the open file, of which only a few chapters are in the editor.
+
+    The whole Bible is too long to lay out at once, so the document holds
+    the chapters either side of the one being read, and as it is scrolled
+    a chapter is added at one end and one dropped from the other.  Lines
+    are numbered through the whole file, as Amap numbers them, and blocks
+    through the document; line() and block() translate between them.  Any
+    other file is a single chapter, so is all in the document.
+    """
+
+    RADIUS = 2  # The chapters kept either side of the one being read.
+
+    def __init__(self, editor: QPlainTextEdit) -> None:
+        self.editor = editor
+        self.lines: list[str] = []
+        self.bounds: list[int] = [0, 0]  # The first line of each chapter, then the end.
+        self.first = 0  # The first line in the document,
+        self.last = 0   # and the one after its last.
+        self._following = False
+        editor.document().setUndoRedoEnabled(False)
+
+    def open(self, lines: list[str], bounds: list[int] | None = None) -> None:
+        """Show lines, its chapters starting on the lines bounds, from the start."""
+
+        self.lines = lines
+        self.bounds = (bounds or [0]) + [len(self.lines)]
+        self.first = self.last = 0
+        self.show(0)
+
+    def line(self, block: int) -> int:
+        """The line of the file shown in block."""
+        return block + self.first
+
+    def block(self, ln: int) -> int:
+        """The block showing line ln of the file, or -1 if it is not in the document."""
+        return ln - self.first if self.first <= ln < self.last else -1
+
+    def chapter(self, ln: int) -> int:
+        """The chapter of line ln, numbered from 0 through the file."""
+        return bisect_right(self.bounds, ln, 0, len(self.bounds) - 1) - 1
+
+    def show(self, ln: int) -> None:
+        """Make sure line ln is in the document, with a screenful of lines after it.
+
+        If not, its chapters are put there in place of those that were.
+        """
+
+        editor = self.editor
+        rows = editor.viewport().height() // editor.fontMetrics().lineSpacing() + 1
+        end = len(self.lines)
+        if self.block(ln) != -1 and (self.last - ln > rows or self.last == end):
+            return
+        c = self.chapter(ln)
+        self.first = self.bounds[max(0, c - self.RADIUS)]
+        self.last = self.bounds[min(len(self.bounds) - 1, c + self.RADIUS + 1)]
+        while self.last - ln <= rows and self.last < end:  # After some short chapters.
+            self.last = self.bounds[self.chapter(self.last) + 1]
+        w.hiLita.forget()
+        editor.setPlainText('\n'.join(self.lines[self.first:self.last]))
+
+    def scroll_to(self, ln: int) -> None:
+        """Put the cursor on line ln, and that line at the top of the view.
+
+        Coming to it from the end of the document, the editor scrolls the
+        line to the top, and lays out only the blocks it shows.  Switching
+        the line wrap mode off and on again, as was done, laid out all of
+        them.  The scroll bar can't be set to the line instead, as its
+        value counts lines that change as the blocks are laid out.
+        """
+
+        editor = self.editor
+        # Not to follow the view while it is on its way there.
+        self._following = True
+        try:
+            self.show(ln)
+            editor.moveCursor(QtGui.QTextCursor.MoveOperation.End)
+            editor.setTextCursor(QtGui.QTextCursor(editor.document().findBlockByNumber(self.block(ln))))
+        finally:
+            self._following = False
+        while self.follow():
+            pass
+
+    def follow(self) -> bool:
+        """Add the next chapter, or the one before, when the view reaches the end.
+
+        A chapter is dropped from the other end only if neither it nor the
+        next is in view, so the view never reaches that end at once.
+        Return True if the document was changed.
+        """
+
+        # Finding what is in view lays out blocks, which may scroll and so
+        # call this again.
+        if self._following:
+            return False
+        self._following = True
+        try:
+            return self._follow(self.editor.verticalScrollBar())
+        finally:
+            self._following = False
+
+    def _follow(self, scrollbar: QtWidgets.QScrollBar) -> bool:
+        editor = self.editor
+        top = editor.cursorForPosition(QtCore.QPoint(0, 0)).block()
+        bottom = editor.cursorForPosition(QtCore.QPoint(0, editor.viewport().height() - 1))
+        c_top = self.chapter(self.line(top.blockNumber()))
+        c_bottom = self.chapter(self.line(bottom.blockNumber()))
+        c_first, c_last = self.chapter(self.first), self.chapter(self.last - 1)
+        full = c_last - c_first >= 2 * self.RADIUS
+        if c_bottom >= c_last and self.last < len(self.lines):
+            first = self.bounds[c_first + (full and c_top > c_first + 1)]
+            last = self.bounds[c_last + 2]
+        elif c_top <= c_first and self.first > 0:
+            first = self.bounds[c_first - 1]
+            last = self.bounds[c_last + 1 - (full and c_bottom < c_last - 1)]
+        else:
+            return False
+
+        # Keep what is on screen where it is.
+        ln = self.line(top.blockNumber())
+        down = scrollbar.value() - top.firstLineNumber()
+        self._move(first, last)
+        block = editor.document().findBlockByNumber(self.block(ln))
+        scrollbar.setValue(block.firstLineNumber() + down)
+
+        return True
+
+    def _move(self, first: int, last: int) -> None:
+        """Change the document to lines first to last, which overlap those in it."""
+
+        document = self.editor.document()
+        cursor = QtGui.QTextCursor(document)
+        if last > self.last:
+            cursor.movePosition(QtGui.QTextCursor.MoveOperation.End)
+            cursor.insertText('\n' + '\n'.join(self.lines[self.last:last]))
+        elif last < self.last:
+            cursor.setPosition(document.findBlockByNumber(last - self.first).position() - 1)
+            cursor.movePosition(QtGui.QTextCursor.MoveOperation.End,
+                                QtGui.QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+        self.last = last
+        if first < self.first:
+            # The blocks are numbered from the new first line as they are made.
+            lines = self.lines[first:self.first]
+            self.first = first
+            cursor.movePosition(QtGui.QTextCursor.MoveOperation.Start)
+            cursor.insertText('\n'.join(lines) + '\n')
+        elif first > self.first:
+            cursor.movePosition(QtGui.QTextCursor.MoveOperation.Start)
+            cursor.setPosition(document.findBlockByNumber(first - self.first).position(),
+                               QtGui.QTextCursor.MoveMode.KeepAnchor)
+            self.first = first
+            cursor.removeSelectedText()
+
+
 class SyntaxHighlighter(QtGui.QSyntaxHighlighter):
     """Syntax highlighter."""
 
@@ -3132,12 +3400,14 @@ class SyntaxHighlighter(QtGui.QSyntaxHighlighter):
         """Initialise highlighter."""
         super(SyntaxHighlighter, self).__init__(parent)
         self._highlight_lines = {}
+        self._formatted: set[int] = set()  # The lines which have a highlight.
         self.lineinc = 0
         self.keyinc = 0
         self.position = 0
         self.length = 1
         self.fmt = None
         self.clear = False
+        self.key = ' '      # The text highlighted, for its length.
 
     def highlight_line(self, line_num, fmt) -> None:
         """Highlight lines."""
@@ -3145,15 +3415,29 @@ class SyntaxHighlighter(QtGui.QSyntaxHighlighter):
         if isinstance(line_num, int) and \
                 (line_num >= 0) and (isinstance(fmt, QtGui.QTextCharFormat)):
             self._highlight_lines[line_num] = fmt
-            block = self.document().findBlockByLineNumber(line_num)
-            self.rehighlightBlock(block)
+            block_num = w.reader.block(line_num)
+            if block_num != -1:  # Otherwise it is highlighted when its chapter is shown.
+                self.rehighlightBlock(self.document().findBlockByNumber(block_num))
 
     def clear_highlight(self) -> None:
-        """Clear highlight."""
+        """Clear highlight.
+
+        Only the blocks highlighted since the last clear are highlighted
+        again, rather than the whole document.
+        """
 
         if self.clear is True:
             self._highlight_lines = {}
-            self.rehighlight()
+            formatted, self._formatted = self._formatted, set()
+            document = self.document()
+            for line_num in formatted:
+                block_num = w.reader.block(line_num)
+                if block_num != -1:
+                    self.rehighlightBlock(document.findBlockByNumber(block_num))
+
+    def forget(self) -> None:
+        """Forget the blocks highlighted, as the document is about to be replaced."""
+        self._formatted = set()
 
     def highlightBlock(self, text) -> None:
         """Highlight a block."""
@@ -3163,20 +3447,18 @@ class SyntaxHighlighter(QtGui.QSyntaxHighlighter):
             # print("Skipping highlight: _highlight_lines not populated yet.")
             return
 
-        blockNumber = self.currentBlock().blockNumber()
-        self.fmt = self._highlight_lines.get(blockNumber)
+        line_num = w.reader.line(self.currentBlock().blockNumber())
+        self.fmt = self._highlight_lines.get(line_num)
         if self.fmt is not None:
             # noinspection PyTypeChecker
             self.position = w.y + self.lineinc
-            if w.dlg is not None:
-                if w.dlg.checks[2] != 6:
-                    self.length = len(w.key) + self.keyinc
-                else:
-                    self.length += self.keyinc
+            if w.result is not None and w.result.checks[2] == 6:
+                self.length += self.keyinc
             else:
-                self.length = len(w.key) + self.keyinc
+                self.length = len(self.key) + self.keyinc
             self.setFormat(self.position, self.length, self.fmt)
-            # print(f'Block {blockNumber} {KJV[blockNumber]}')
+            self._formatted.add(line_num)
+            # print(f'Block {line_num} {KJV[line_num]}')
 
 
 class FindDialog(QtWidgets.QDialog):
@@ -3185,7 +3467,7 @@ class FindDialog(QtWidgets.QDialog):
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
         # Create an instance of the GUI
-        self.ui = Ui_Dialog()
+        self.ui = find.Ui_Dialog()
         # Run the .setupUi() method to show the GUI
         self.ui.setupUi(self)
 
@@ -3236,6 +3518,25 @@ class FindDialog(QtWidgets.QDialog):
         # Dynamically show/hide the clear button based on text presence
         self.ui.lineEdit_1.textChanged.connect(self.toggle_clear_button)
 
+        # Count the matches as the key is typed, once typing pauses.  Each
+        # change restarts the timer, so a count that is out of date is
+        # never made.
+        self.live_timer = QtCore.QTimer(self)
+        self.live_timer.setSingleShot(True)
+        self.live_timer.setInterval(150)
+        self.live_timer.timeout.connect(self.live_count)
+        # Through a lambda, else the text, bool or index is taken as the
+        # interval.
+        self.ui.lineEdit_1.textChanged.connect(lambda *_: self.live_timer.start())
+        for button in (self.ui.radiobutton_1, self.ui.radiobutton_2, self.ui.radiobutton_3,
+                       self.ui.radiobutton_4, self.ui.radiobutton_5, self.ui.radiobutton_6,
+                       self.ui.checkBox):
+            button.toggled.connect(lambda *_: self.live_timer.start())
+        self.ui.comboBox_1.currentIndexChanged.connect(lambda *_: self.live_timer.start())
+        self.ui.comboBox_2.currentIndexChanged.connect(lambda *_: self.live_timer.start())
+        # Phrases typed so far, Match case and not, narrowed key by key.
+        self.typed = {1: TypedPhrase(stp_index), 0: TypedPhrase(lsp_index)}
+
     def toggle_clear_button(self):
         if self.ui.lineEdit_1.text():
             self.ui.pushButton_1.show()
@@ -3249,12 +3550,68 @@ class FindDialog(QtWidgets.QDialog):
 
         i: int
         j: int
-        w.key = self.ui.lineEdit_1.text()
+        self.live_timer.stop()
+        key: str = self.ui.lineEdit_1.text()
         i, j = self.get_scope()
-        self.get_checks()
-        w.findf3(i, j)
+        self.checks = self.get_checks()
+        w.findf3(key, i, j)
         w.close_find_window()
 
+    def live_count(self) -> None:
+        """Show in status_label how many matches there are for the key typed so far.
+
+        The last word of a Whole words key may be unfinished, and counts as
+        any word it begins.  A regex is only counted by Find.
+        """
+
+        text: str = self.ui.lineEdit_1.text()
+        checks = self.get_checks()  # Not kept, in case the dialog is cancelled.
+        if checks[2] == 6 or not text.strip():
+            self.ui.status_label.clear()
+            return
+        i, j = self.get_scope()
+        x1 = book_bounds[i]
+        x2 = book_bounds[j + 1] - 1
+        mode, case = checks[0], checks[1]
+        key = key_for_find(text, mode == 1)
+        if mode == 1:   # Raw
+            use_raw_index()
+            if case == 1:
+                n = raw_new.count(key, x1, x2)
+            else:
+                n = raw_low.count(key.lower(), x1, x2)
+            self.ui.status_label.setText(f'{n} found')
+            return
+
+        if case == 0:
+            key = key.lower()
+        words = split_strip(key)[1].split()
+        prefix = ''
+        if words and not key.endswith(' '):
+            prefix = words.pop()
+        if mode == 2:   # Whole words, as a phrase
+            n = self.typed[case].count(words, prefix, x1, x2)
+            self.ui.status_label.setText(f'{n} found' if not prefix else f'{n} found for {prefix}…')
+            return
+
+        # All or any of the words: the verses with them.  An unfinished
+        # word is left out, unless it is a word already.
+        _set: PostingStore = set_dict if case == 1 else set_lowdict
+        if prefix in _set:
+            words.append(prefix)
+        verses = [_set.get(word, x1, x2) for word in words if word in _set]
+        if not verses or (mode == 3 and len(verses) < len(words)):
+            n = 0
+        else:
+            # Sets, as only the number is needed, and they are quicker
+            # than intersect and union for the longest lists.
+            verses.sort(key=len)
+            if mode == 3:
+                n = len(set(verses[0]).intersection(*verses[1:]))
+            else:
+                n = len(set(verses[0]).union(*verses[1:]))
+        self.ui.status_label.setText(f'{n} verses')
+
     def get_scope(self) -> tuple[int, int]:
         """Get the scope from the comboboxes."""
 
@@ -3264,51 +3621,63 @@ class FindDialog(QtWidgets.QDialog):
             a: int = i
             i = j
             j = a
-            self.ui.comboBox_1.setCurrentIndex(i)
-            self.ui.comboBox_1.setCurrentIndex(j)
+            # Without signals, so that reading the scope doesn't restart
+            # the live count.
+            with QtCore.QSignalBlocker(self.ui.comboBox_1), QtCore.QSignalBlocker(self.ui.comboBox_2):
+                self.ui.comboBox_1.setCurrentIndex(i)
+                self.ui.comboBox_2.setCurrentIndex(j)
 
         return i, j
 
-    def check_changed(self) -> None:
+    def check_changed(self, checks: list[int]) -> None:
         """Ensure that checkBox is correct."""
 
         if self.ui.checkBox.isChecked():
-            self.checks[1] = 1
+            checks[1] = 1
         else:
-            self.checks[1] = 0
+            checks[1] = 0
 
-    def radiobutton1_4_changed(self) -> None:
+    def radiobutton1_4_changed(self, checks: list[int]) -> None:
         """Ensure that radiobuttons 1 to 4 are correct."""
 
         if self.ui.radiobutton_1.isChecked():
-            self.checks[0] = 1
+            checks[0] = 1
         elif self.ui.radiobutton_2.isChecked():
-            self.checks[0] = 2
+            checks[0] = 2
         elif self.ui.radiobutton_3.isChecked():
-            self.checks[0] = 3
+            checks[0] = 3
         elif self.ui.radiobutton_4.isChecked():
-            self.checks[0] = 4
+            checks[0] = 4
 
-    def radiobutton5_6_changed(self) -> None:
+    def radiobutton5_6_changed(self, checks: list[int]) -> None:
         """Ensure that radiobuttons 5 & 6 are correct."""
 
         if self.ui.radiobutton_6.isChecked():
-            self.checks[2] = 6
+            checks[2] = 6
             self.ui.radiobutton_1.setChecked(True)
-            self.checks[0] = 1
+            checks[0] = 1
         else:
-            self.checks[2] = 5
+            checks[2] = 5
 
-    def get_checks(self) -> None:
-        """Store the states of the checkboxes in the list checks."""
+    def get_checks(self) -> list[int]:
+        """The states of the checkboxes, as the list checks holds them.
 
-        self.checks = [1, 0, 5]
-        self.check_changed()
-        self.radiobutton1_4_changed()
-        self.radiobutton5_6_changed()
+        Only getter keeps them in checks, for the find it starts.
+        """
+
+        checks = [1, 0, 5]
+        self.check_changed(checks)
+        self.radiobutton1_4_changed(checks)
+        self.radiobutton5_6_changed(checks)
+
+        return checks
 
 
 if __name__ == '__main__':
+    freeze_support()  # For the raw index Process, in the frozen Windows build.
+    started: float = time.perf_counter()  # For the time to first paint.
+    if environ.get('ABIB_IMPORT_TIME'):
+        report_import_time()
 
     current_directory: Path = Path.cwd()
     str_cwd: str = str(current_directory)
@@ -3346,6 +3715,7 @@ if __name__ == '__main__':
 
     # Show the splash screen if enabled in settings
     splash_path = current_directory / "images" / "Abib_barley.png"
+    splash: QSplashScreen | None = None
     if settings.get("show_splash", False):  # Default to False if the key is missing.
         splash = QSplashScreen(QPixmap(splash_path))
         splash.show()
@@ -3360,9 +3730,7 @@ if __name__ == '__main__':
     MAX_CHAPTER_COUNT = 150
     BOOKS_IN_THE_BIBLE = 66
     CHAPTERS_IN_THE_BIBLE = 1189
-    LAST_VERSE_IN_BIBLE = 31101  # The first verse being zero.
-    EOF_BIBLE_TEXT = LAST_VERSE_IN_BIBLE + 1
-    EOF_AMAP = EOF_INFO = EOF_BIBLE_TEXT + 17
+    # LAST_VERSE_IN_BIBLE and the file lengths are in corpus.py.
 
     w: MainWindow = MainWindow()
 
@@ -3378,20 +3746,9 @@ if __name__ == '__main__':
     w.hiLita.length = 1
     w.no_f3_yet = 0
     w.yend = 0
-    w.finding = 0
-    w.verse = 0
-    w.occurring = 0
-    w.occurrence = 0
-    w.occur = []
-    w.occurs = []
-    w.count = []
-    w.PCE_text = []
-    w.key = ' '
-    w.keym = ''
+    w.result = None  # The SearchResult of the last find, with the hit reached.
     w.message = ''
-    w.store = ' '
     # w.hiLita.clear = True
-    w.gent = None
     w.otherFileFlag = True
 
     linehighlightcolor: QColor = QtGui.QColor("#0138b7")
@@ -3507,49 +3864,22 @@ if __name__ == '__main__':
 
     starts_with_italics: list[int] = [6203, 13009, 14972, 15412, 22195, 28117]
 
-    # -------------------------------------------------- #
-    KJB_PCE_LASTLINE = 36199
-    # Including about 70 blank lines at the end which are
-    # retained and 118 lines of copyright notice at the
-    # beginning which are removed below.
-    # Plus, there are about 182 lines comprising
-    # THE HOLY BIBLE title etc.
-    # TO THE MOST HIGH AND MIGHTY PRINCE JAMES,
-    # THE EPISTLE DEDICATORY
-    # THE TRANSLATORS TO THE READER
-    # THE NAMES AND ORDER OF THE BOOKS OF THE
-    # OLD AND NEW TESTAMENT, WITH ABBREVIATIONS.
-    #
-    # So, that is 31,102 + 70 + 118 + 182 + 66 BOOK TITLES +
-    # THE 1,189 CHAPTER TITLES AND BLANK LINES = 36,199
-    # -------------------------------------------------- #
-
-    # Construct full file path using pathlib
-    file_path = str(Path(str_cwd) / "KJB_PCE.txt")
-    # Pass the constructed path to readio
-    KJV = readio('', file_path, KJB_PCE_LASTLINE)
-
-    EOTNOC: str = '****END OF THE NOTICE OF COPYRIGHT****\n'
-
-    i_: int = 0
-    try:
-        i_ = KJV.index(EOTNOC)
-    except ValueError:
-        print('Failed to find the line ', EOTNOC)
-        print('Cannot continue until this is put right.')
-        exit('Reinstalling the program should resolve this.')
-    KJV = KJV[i_ + 1:]
-    KJV = tuple(KJV)
-
-    assert (len(KJV) == KJB_PCE_LASTLINE - 118)
+    # Create the base directory as a Path object
+    base_dir = Path(str_cwd)
+    # The corpus bundle and the raw index are built in the user's
+    # directory, as the one Abib is installed in may be read-only.
+    bundle_dir: Path = user_settings_dir
 
-    # Use pathlib to construct the path
-    file_path = str(Path(str_cwd) / "Amap.txt")
+    # Memory-map the corpus bundle, compiling it first from the text
+    # files if any of them is newer.  See corpus.py.
+    startup_progress('Opening the corpus')
+    bundle = load_bundle(base_dir, startup_progress, bundle_dir)
 
-    # Pass the constructed path to the function
-    Amap: list = readfile('', file_path, EOF_AMAP)
+    startup_progress('Reading the text')
+    KJV = bundle.lines('KJV').lines()
 
-    Amap = Amap[17:]
+    # Amap[x] is the line of the display on which verse x starts.  See BlockMap.
+    Amap: BlockMap = BlockMap(bundle.array('Amap'))
 
     Ps119: list[int] = [
         15907, 15915, 15923, 15931, 15939, 15947, 15955, 15963, 15971, 15979,
@@ -3560,55 +3890,50 @@ if __name__ == '__main__':
         v: Any = Amap[_]
         P119.append(v)
 
-    # Create the base directory as a Path object
-    base_dir = Path(str_cwd)
-
-    # Read Info.txt
-    Info = []
-    Inf: list = readfile('', str(Path(base_dir / "Info.txt")), EOF_INFO)
-    Inf = Inf[17:]  # Skip the first 17 elements
-    for _ in range(LAST_VERSE_IN_BIBLE + 1):
-        Info.append(loads(Inf[_]))
-    Info = tuple(Info)
+    # Info[x] is (book, chapter, verse) of verse x.  See VerseTable.
+    Info: VerseTable = bundle.verse_table('Info')
 
     # Open KJB_PCE.txt
+    startup_progress('Opening the Bible')
     w.file_open(str(base_dir / "KJB_PCE.txt"))
 
-    # Read stripped_dict.txt
-    with open("stripped_dict.txt", encoding="utf-8") as f:
-        stripped_dict: Any = load(f)
-
-    # Read strpd_low_dict.txt
-    with open("strpd_low_dict.txt", encoding="utf-8") as f:
-        strpd_low_dict: Any = load(f)
-
-    # Load dictionaries using load_list_set_dict
-    set_dict: dict[Any, set] = load_list_set_dict("list_dict.json", stripped_dict)
-    set_lowdict: dict[Any, set] = load_list_set_dict("list_lowdict.json", strpd_low_dict)
-
-    # Read and process PCE-find.txt
-    Rnew = readio('', str(Path(base_dir / "PCE-find.txt")), EOF_BIBLE_TEXT)
-    Rnew = tuple(Rnew)
-    Rdic: dict[int, Any] = dict(enumerate(Rnew))  # Convert Rnew to dictionary.
-
-    # Read and process PCE-lower.txt
-    Rlow = readio('', str(Path(base_dir / "PCE-lower.txt")), EOF_BIBLE_TEXT)
-    Rlow = tuple(Rlow)
-    Ldic: dict[int, Any] = dict(enumerate(Rlow))  # Convert Rlow to dictionary.
-
-    # Read PCE-stripped.txt
-    Rstp = readio('', str(Path(base_dir / "PCE-stripped.txt")), EOF_BIBLE_TEXT)
-    Rstp = tuple(Rstp)
-
-    # Read PCE-stripped_lower.txt
-    Rlsp = readio('', str(Path(base_dir / "PCE-stripped_lower.txt")), EOF_BIBLE_TEXT)
-    Rlsp = tuple(Rlsp)
+    # What searches need loads in the background once the Bible is shown,
+    # in first_painted; F3 and F12 wait for it.  See load_search_data.
+    stripped_dict: Any = None
+    strpd_low_dict: Any = None
+    set_dict: PostingStore | None = None
+    set_lowdict: PostingStore | None = None
+    Rnew: list[str] = []
+    Rlow: list[str] = []
+    raw_new: RawText | SuffixArray | None = None
+    raw_low: RawText | SuffixArray | None = None
+    Rstp: list[str] = []
+    Rlsp: list[str] = []
+    stp_index: PositionalIndex | None = None
+    lsp_index: PositionalIndex | None = None
+    Ostp: OffsetMap | None = None
+    Okjv: OffsetMap | None = None
+    sme_data: Any = None
+
+    # The suffix arrays of Rnew and Rlow, if they need building, are built
+    # in another process, as it takes a while.  The QApplication and its
+    # threads are running by now, so it is spawned, not forked; see
+    # processes.py.  They are built from the bundle file, so not if it is
+    # in memory.
+    raw_index_job: BaseProcess | None = None
+    if not bundle.in_memory and load_raw_index(bundle_dir) is None:
+        raw_index_job = start_process(build_raw_index, (bundle_dir,))
+
+    # Regex searches run in other processes, shared between them.  Each
+    # loads Rnew from the bundle for itself, or is sent it if the bundle
+    # is in memory.
+    if bundle.in_memory:
+        regex_pool = RegexPool(tuple, bundle.lines('Rnew').lines())
+    else:
+        regex_pool = RegexPool(read_lines, bundle_dir, 'Rnew')
 
-    try:
-        with open("morning_evening.json", "r", encoding="utf-8") as file:
-            sme_data = load(file)  # Load JSON data
-    except JSONDecodeError as e:
-        print(f"JSON file is invalid: {e}")
+    # The results of recent searches, for F3 and F5/F6 to use again.
+    result_cache = ResultCache(settings.get('find_cache_mb', 64) << 20)
 
     date_file: tuple = get_date_file()
 
@@ -3626,6 +3951,9 @@ if __name__ == '__main__':
     app_icon: QIcon = QIcon(str(icon_path))  # Convert the Path object to string for QIcon
     app.setWindowIcon(app_icon)
 
+    app.aboutToQuit.connect(regex_pool.shutdown)
+    startup_progress('Showing the window')
+    FirstPaint(w.textEditor.viewport(), w.first_painted)
     w.show()
     exit(app.exec())
 # This is a new line that ends the file.
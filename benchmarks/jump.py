@@ -0,0 +1,77 @@
+"""
+Copyright 2025 Andrew Kingston.
+
+This file is part of Abib Bible Reader.
+
+Abib is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+Abib is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Abib.  If not, see <https://www.gnu.org/licenses/>.
+
+Time a jump to a block of a QPlainTextEdit, as Abib's navigation does it.
+
+'wrap toggle' is the old way: line wrap off, the cursor to the end and
+back to the block, line wrap on again.  'scroll' is the same without the
+line wrap, as ChapterWindow.scroll_to does.  Each is timed on documents
+of a quarter, one and four times the size of the Bible, made from
+Pilgrims-Progress.txt; the time of a scroll should not grow with the size.
+
+    python benchmarks/jump.py [jumps]
+"""
+import random
+import sys
+from pathlib import Path
+from time import perf_counter
+
+from PySide6 import QtGui, QtWidgets
+
+BLOCKS = (9000, 36000, 144000)
+
+
+def wrap_toggle(editor: QtWidgets.QPlainTextEdit, ln: int) -> None:
+    editor.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.NoWrap)
+    linecursor = QtGui.QTextCursor(editor.document().findBlockByLineNumber(ln))
+    editor.moveCursor(QtGui.QTextCursor.MoveOperation.End)
+    editor.setTextCursor(linecursor)
+    editor.setLineWrapMode(QtWidgets.QPlainTextEdit.LineWrapMode.WidgetWidth)
+
+
+def scroll(editor: QtWidgets.QPlainTextEdit, ln: int) -> None:
+    editor.moveCursor(QtGui.QTextCursor.MoveOperation.End)
+    editor.setTextCursor(QtGui.QTextCursor(editor.document().findBlockByNumber(ln)))
+
+
+def main() -> None:
+    jumps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    lines = (Path(__file__).parent.parent / 'Pilgrims-Progress.txt').read_text(
+        encoding='utf-8').splitlines()
+    editor = QtWidgets.QPlainTextEdit()
+    editor.resize(1000, 800)
+    editor.show()
+    random.seed(1)
+    print(f'{"blocks":>8} {"wrap toggle":>12} {"scroll":>12}  (ms per jump)')
+    for blocks in BLOCKS:
+        editor.setPlainText('\n'.join(lines[i % len(lines)] for i in range(blocks)))
+        app.processEvents()
+        targets = [random.randrange(blocks) for _ in range(jumps)]
+        times = []
+        for jump in (wrap_toggle, scroll):
+            start = perf_counter()
+            for ln in targets:
+                jump(editor, ln)
+                app.processEvents()
+            times.append((perf_counter() - start) * 1000 / jumps)
+        print(f'{blocks:>8} {times[0]:>12.2f} {times[1]:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Copyright 2025 Andrew Kingston.
+
+This file is part of Abib Bible Reader.
+
+Abib is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+Abib is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Abib.  If not, see <https://www.gnu.org/licenses/>.
+
+Time reading the source files of the corpus bundle, as build_bundle does.
+
+'readline' is the old way: a readline() per line, each split again and
+given back its '\\n', and for Amap.txt and Info.txt an int() tried on
+every line.  'bulk' is the way of corpus.py now: each file read and split
+in one call, and the numbers of Amap.txt and the lists of Info.txt each
+parsed in one go.  Both make the same values.
+
+    python benchmarks/load.py [repeats]
+"""
+import sys
+from array import array
+from json import loads
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from corpus import (EOF_AMAP, EOF_BIBLE_TEXT, EOF_INFO, HEADER_LINES,
+                    read_json_lines, read_numbers, readio)
+
+BASE_DIR = Path(__file__).parent.parent
+TEXTS = ('PCE-stripped.txt', 'PCE-stripped_lower.txt')
+
+
+def readline_readfile(filename: str, file_length: int) -> list:
+    output_listname = []
+    with open(filename, 'r') as f_read:
+        for _ in range(file_length):
+            x5 = f_read.readline()
+            try:
+                i_line = int(x5.splitlines()[0])
+            except ValueError:
+                i_line = x5.splitlines()[0]
+            output_listname.append(i_line)
+    return output_listname
+
+
+def readline_readio(filename: str, file_length: int) -> list:
+    output_listname = []
+    with open(filename, 'r', encoding='utf-8') as f_readio:
+        for _ in range(file_length):
+            x5 = f_readio.readline()
+            output_listname.append(f'{x5.splitlines()[0]}\n')
+    return output_listname
+
+
+def readline(name: str):
+    filename = str(BASE_DIR / name)
+    if name == 'Amap.txt':
+        return array('I', readline_readfile(filename, EOF_AMAP)[HEADER_LINES:])
+    if name == 'Info.txt':
+        return [loads(line) for line in readline_readfile(filename, EOF_INFO)[HEADER_LINES:]]
+    return readline_readio(filename, EOF_BIBLE_TEXT)
+
+
+def bulk(name: str):
+    filename = str(BASE_DIR / name)
+    if name == 'Amap.txt':
+        return read_numbers(filename, EOF_AMAP)
+    if name == 'Info.txt':
+        return read_json_lines(filename, EOF_INFO)
+    return readio('', filename, EOF_BIBLE_TEXT)
+
+
+def main() -> None:
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f'{"file":>24} {"readline":>10} {"bulk":>10}  (ms per read)')
+    for name in ('Amap.txt', 'Info.txt') + TEXTS:
+        assert readline(name) == bulk(name), name
+        times = []
+        for read in (readline, bulk):
+            start = perf_counter()
+            for _ in range(repeats):
+                read(name)
+            times.append((perf_counter() - start) * 1000 / repeats)
+        print(f'{name:>24} {times[0]:>10.2f} {times[1]:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,792 @@
+"""
+Copyright 2025 Andrew Kingston.
+
+This file is part of Abib Bible Reader.
+
+Abib is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+Abib is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Abib.  If not, see <https://www.gnu.org/licenses/>.
+
+The corpus bundle.
+
+The text and JSON files shipped with Abib remain the source of truth.
+They are compiled into a single binary file, 'corpus.abib', which is
+memory-mapped at startup instead of reading and parsing each file line
+by line.  The bundle is rebuilt whenever any of its sources is newer.
+
+Layout of the bundle (the arrays are in the byte order of the machine
+that built it, which is recorded in the header):
+
+    header   magic (8s), version (I), byte order (4s), section count (I)
+    table    one entry per section: name (32s), typecode (c), offset (Q),
+             size (Q)
+    data     each section is a raw array of its typecode, 8-byte aligned
+
+A list of strings (a string pool) is stored as two sections: 'name.off',
+the byte offsets of each string ('I'), and 'name.dat', the UTF-8 bytes.
+
+A search finds its hits in the stripped text, or for a Raw search in the
+find text, and they are highlighted in the display text.  Two OffsetMaps
+translate between these: 'Ostp' from the stripped text to the find text,
+which has the punctuation the stripped text lacks, and 'Okjv' from the
+find text to the columns of the display, where each Unicode italic
+letter takes two.
+"""
+import mmap
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO, open
+from json import load, loads
+from os import path, replace
+from pathlib import Path
+from sys import exit, byteorder
+from time import perf_counter
+from typing import Any, Callable
+
+from search import PositionalIndex, PostingStore, RawText, postings_of, suffix_array, tokenize
+
+# -------------------------------------------------- #
+LAST_VERSE_IN_BIBLE = 31101  # The first verse being zero.
+EOF_BIBLE_TEXT = LAST_VERSE_IN_BIBLE + 1
+EOF_AMAP = EOF_INFO = EOF_BIBLE_TEXT + 17
+HEADER_LINES = 17  # Copyright lines at the top of Amap.txt and Info.txt.
+
+KJB_PCE_LASTLINE = 36199
+# Including about 70 blank lines at the end which are
+# retained and 118 lines of copyright notice at the
+# beginning which are removed below.
+# Plus, there are about 182 lines comprising
+# THE HOLY BIBLE title etc.
+# TO THE MOST HIGH AND MIGHTY PRINCE JAMES,
+# THE EPISTLE DEDICATORY
+# THE TRANSLATORS TO THE READER
+# THE NAMES AND ORDER OF THE BOOKS OF THE
+# OLD AND NEW TESTAMENT, WITH ABBREVIATIONS.
+#
+# So, that is 31,102 + 70 + 118 + 182 + 66 BOOK TITLES +
+# THE 1,189 CHAPTER TITLES AND BLANK LINES = 36,199
+# -------------------------------------------------- #
+
+EOTNOC: str = '****END OF THE NOTICE OF COPYRIGHT****\n'
+
+BUNDLE_NAME = 'corpus.abib'
+# The suffix arrays for raw searches, which take too long to build with
+# the rest of the bundle.
+RAW_INDEX_NAME = 'raw.abib'
+BUNDLE_MAGIC = b'ABIBCORP'
+BUNDLE_VERSION = 5
+
+_HEADER = struct.Struct('<8sI4sI')
+_ENTRY = struct.Struct('<32scQQ')
+_ALIGN = 8
+
+# Source files compiled into the bundle.
+BUNDLE_SOURCES: tuple[str, ...] = (
+    'KJB_PCE.txt', 'Amap.txt', 'Info.txt',
+    'PCE-find.txt', 'PCE-lower.txt', 'PCE-stripped.txt', 'PCE-stripped_lower.txt',
+    'stripped_dict.txt', 'strpd_low_dict.txt', 'list_dict.json', 'list_lowdict.json')
+
+_LINE = re.compile(r'[^\n]*\n')
+
+
+class BundleError(Exception):
+    """The bundle is missing, corrupt or from another version of Abib."""
+
+
+def read_lines_of(filename: str, file_length: int) -> list[str]:
+    """The first file_length lines of a text file, each ending with '\n'.
+
+    The file is read and split in one call.  Abib exits if it is missing
+    or shorter.
+    """
+
+    try:
+        with open(filename, 'r', encoding='utf-8') as file:
+            lines = file.readlines()
+    except FileNotFoundError:
+        exit("Abib is not in the same directory as its files and folders.\n")
+    if len(lines) < file_length:
+        print(f'{filename} has {len(lines)} lines, not {file_length}.')
+        exit('Reinstalling the program should resolve this.')
+    del lines[file_length:]
+    if not lines[-1].endswith('\n'):
+        lines[-1] += '\n'
+
+    return lines
+
+
+def readio(input_path: str, input_filename: str, file_length: int) -> list:
+    """Read Bible files."""
+
+    return read_lines_of(f'{input_path}{input_filename}', file_length)
+
+
+def read_numbers(filename: str, file_length: int) -> array:
+    """The numbers on the lines of Amap.txt, after its HEADER_LINES."""
+
+    lines = read_lines_of(filename, file_length)
+    try:
+        return array('I', map(int, lines[HEADER_LINES:]))
+    except ValueError as err:
+        exit(f'{filename} is corrupt: {err}')
+
+
+def read_json_lines(filename: str, file_length: int) -> list:
+    """The JSON value on each line of Info.txt, after its HEADER_LINES."""
+
+    lines = read_lines_of(filename, file_length)
+    try:
+        return loads(f'[{",".join(lines[HEADER_LINES:])}]')
+    except ValueError as err:
+        exit(f'{filename} is corrupt: {err}')
+
+
+def load_json_dict(file_dict: Any) -> Any:
+    """Load a dictionary with JSON."""
+
+    # print('load_json_dict ', file_dict)
+    with open(file_dict, "r", encoding='utf-8') as read_file:
+        file1 = load(read_file)
+
+    return file1
+
+
+class LinePool:
+    """A read-only sequence of strings held as UTF-8 in the bundle.
+
+    Each item is decoded on access.  Use lines() to decode the whole
+    pool at once when every line is needed.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview) -> None:
+        self._offsets = offsets
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        return bytes(self._data[self._offsets[index]:self._offsets[index + 1]]).decode('utf-8')
+
+    def __iter__(self):
+        return iter(self.lines())
+
+    def text(self) -> str:
+        """All the lines as one string."""
+        return bytes(self._data).decode('utf-8')
+
+    def lines(self) -> tuple[str, ...]:
+        """All the lines, each ending with '\\n', as readio returns them."""
+        return tuple(_LINE.findall(self.text()))
+
+    def split(self) -> list[str]:
+        """All the lines without their '\\n' endings."""
+        return self.text().split('\n')[:-1]
+
+
+class VerseTable:
+    """The book, chapter and verse of every verse in the Bible.
+
+    This replaces the tuple of [book, chapter, verse] lists read from
+    Info.txt.  The three columns are array('H') and are indexed by verse
+    number, so Info[x][0] is still the book of verse x.  Prefix offset
+    tables of the first verse of each book and chapter make index() O(1).
+    All the values are zero-based.
+    """
+
+    __slots__ = ('books', 'chapters', 'verses', '_book_start', '_book_chapter', '_chapter_start')
+
+    def __init__(self, books, chapters, verses) -> None:
+        self.books = array('H', books)
+        self.chapters = array('H', chapters)
+        self.verses = array('H', verses)
+        if not len(self.books) == len(self.chapters) == len(self.verses):
+            raise ValueError('The columns of a VerseTable must have the same length.')
+
+        # _book_start[b] is the first verse of book b.
+        # _book_chapter[b] is the position in _chapter_start of chapter 0 of book b.
+        # _chapter_start[_book_chapter[b] + c] is the first verse of chapter c of book b.
+        # Each table ends with a sentinel, so the next entry gives the end.
+        self._book_start = array('I')
+        self._book_chapter = array('I')
+        self._chapter_start = array('I')
+        book = chapter = -1
+        for x_, (b, c) in enumerate(zip(self.books, self.chapters)):
+            if b != book:
+                book, chapter = b, -1
+                self._book_start.append(x_)
+                self._book_chapter.append(len(self._chapter_start))
+            if c != chapter:
+                chapter = c
+                self._chapter_start.append(x_)
+        self._book_start.append(len(self.books))
+        self._book_chapter.append(len(self._chapter_start))
+        self._chapter_start.append(len(self.books))
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def __getitem__(self, x_: int) -> tuple[int, int, int]:
+        return self.books[x_], self.chapters[x_], self.verses[x_]
+
+    def __iter__(self):
+        return zip(self.books, self.chapters, self.verses)
+
+    def index(self, bcv) -> int:
+        """Return the verse number of [book, chapter, verse].
+
+        Raise ValueError if there is no such verse, as list.index does.
+        """
+
+        book, chapter, verse = bcv
+        if 0 <= book < self.book_count() and 0 <= chapter < self.chapter_count(book):
+            k = self._book_chapter[book] + chapter
+            x_ = self._chapter_start[k] + verse
+            if 0 <= verse and x_ < self._chapter_start[k + 1]:
+                return x_
+        raise ValueError(f'{list(bcv)} is not in the Bible.')
+
+    def book_count(self) -> int:
+        """The number of books."""
+        return len(self._book_start) - 1
+
+    def chapter_count(self, book: int) -> int:
+        """The number of chapters in book."""
+        return self._book_chapter[book + 1] - self._book_chapter[book]
+
+    def verse_count(self, book: int, chapter: int) -> int:
+        """The number of verses in chapter of book."""
+
+        k = self._book_chapter[book] + chapter
+        return self._chapter_start[k + 1] - self._chapter_start[k]
+
+    def book_start(self, book: int) -> int:
+        """The verse number of the first verse of book."""
+        return self._book_start[book]
+
+    def chapter_start(self, book: int, chapter: int) -> int:
+        """The verse number of the first verse of chapter of book."""
+        return self._chapter_start[self._book_chapter[book] + chapter]
+
+
+class BlockMap:
+    """The display block (line) of KJB_PCE.txt on which each verse starts.
+
+    This replaces the Amap list read from Amap.txt.  Amap[x] is the block
+    of verse x as before, and Amap.index(block) is the verse which starts on
+    block, found in O(1) from a reverse table instead of a linear scan.
+    The blocks increase with the verses, so verse_at_or_after() can
+    bisect them for blocks that are titles or blank lines.
+    """
+
+    __slots__ = ('blocks', '_verses')
+
+    def __init__(self, blocks) -> None:
+        self.blocks = array('I', blocks)
+        # _verses[block] is the verse starting on block, or -1 if none.
+        self._verses = array('i', [-1]) * ((self.blocks[-1] + 1) if self.blocks else 0)
+        for x_, block in enumerate(self.blocks):
+            self._verses[block] = x_
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __getitem__(self, x_: int) -> int:
+        return self.blocks[x_]
+
+    def __iter__(self):
+        return iter(self.blocks)
+
+    def __contains__(self, block: int) -> bool:
+        return 0 <= block < len(self._verses) and self._verses[block] != -1
+
+    def index(self, block: int) -> int:
+        """Return the verse which starts on block.
+
+        Raise ValueError if no verse starts there, as list.index does.
+        """
+
+        if block in self:
+            return self._verses[block]
+        raise ValueError(f'No verse starts on block {block}.')
+
+    def verse_at_or_after(self, block: int) -> int:
+        """Return the first verse starting on or after block.
+
+        This is len(self) if block is after the last verse.
+        """
+        return bisect_left(self.blocks, block)
+
+
+class OffsetMap:
+    """Per-verse maps from the offsets of one text to those of another.
+
+    Each verse keeps a sorted list of break points, one for every
+    character (or display column) the other text has in addition.
+    Offset k then maps to k plus the number of break points at or
+    before k, found by a bisect of the verse's few break points in
+    place of a scan of its characters.
+    """
+
+    __slots__ = ('_offsets', '_breaks')
+
+    def __init__(self, offsets, breaks) -> None:
+        self._offsets = offsets
+        self._breaks = breaks
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def place(self, x_: int, k: int) -> int:
+        """Return offset k of verse x_ in the other text."""
+
+        lo = self._offsets[x_]
+        return k + bisect_right(self._breaks, k, lo, self._offsets[x_ + 1]) - lo
+
+
+class CorpusBundle:
+    """A memory-mapped corpus bundle.
+
+    If data is given, it is the bundle, which was built in memory, and
+    filename only names it.
+    """
+
+    def __init__(self, filename: str | Path, data: bytes | None = None) -> None:
+        self.in_memory = data is not None
+        if data is not None:
+            self._mm = data
+        else:
+            with open(filename, 'rb') as f_bundle:
+                try:
+                    self._mm = mmap.mmap(f_bundle.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError as err:  # An empty file cannot be mapped.
+                    raise BundleError(f'{filename}: {err}') from None
+        self._view = memoryview(self._mm)
+        self._sections: dict[str, tuple[str, int, int]] = {}
+
+        if len(self._mm) < _HEADER.size:
+            raise BundleError(f'{filename} is truncated.')
+        magic, version, order, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != BUNDLE_MAGIC:
+            raise BundleError(f'{filename} is not an Abib corpus bundle.')
+        if version != BUNDLE_VERSION or order.rstrip(b'\0').decode() != byteorder[:4]:
+            raise BundleError(f'{filename} was built by another version of Abib.')
+        pos = _HEADER.size
+        for _ in range(count):
+            name, typecode, offset, size = _ENTRY.unpack_from(self._mm, pos)
+            pos += _ENTRY.size
+            if offset + size > len(self._mm):
+                raise BundleError(f'{filename} is truncated.')
+            self._sections[name.rstrip(b'\0').decode()] = (typecode.decode(), offset, size)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def array(self, name: str) -> memoryview:
+        """Return a section as a zero-copy typed view of the mapped file."""
+
+        try:
+            typecode, offset, size = self._sections[name]
+        except KeyError:
+            raise BundleError(f'The bundle has no section {name!r}.') from None
+        view = self._view[offset:offset + size]
+        return view if typecode == 'B' else view.cast(typecode)
+
+    def lines(self, name: str) -> LinePool:
+        """Return a string pool section."""
+        return LinePool(self.array(f'{name}.off'), self.array(f'{name}.dat'))
+
+    def verse_table(self, name: str) -> VerseTable:
+        """Return a VerseTable section."""
+        return VerseTable(self.array(f'{name}.b'), self.array(f'{name}.c'), self.array(f'{name}.v'))
+
+    def positional_index(self, name: str) -> PositionalIndex:
+        """Return a PositionalIndex section."""
+
+        return PositionalIndex(self.lines(f'{name}.key').split(), self.array(f'{name}.idx'),
+                               self.array(f'{name}.occ'), self.array(f'{name}.tid'),
+                               self.array(f'{name}.tvr'), self.array(f'{name}.tof'),
+                               self.array(f'{name}.vst'))
+
+    def offset_map(self, name: str) -> OffsetMap:
+        """Return an OffsetMap section."""
+        return OffsetMap(self.array(f'{name}.idx'), self.array(f'{name}.brk'))
+
+    def words(self, name: str) -> dict[str, int]:
+        """Return a word count dictionary, as stripped_dict.txt."""
+        return dict(zip(self.lines(name).split(), self.array(f'{name}.cnt')))
+
+    def posting_store(self, name: str) -> PostingStore:
+        """Return a PostingStore section."""
+
+        return PostingStore(self.lines(f'{name}.key').split(), self.array(f'{name}.idx'),
+                            self.array(f'{name}.vrs'))
+
+
+class BundleWriter:
+    """Collect typed arrays and write them out as a bundle."""
+
+    def __init__(self) -> None:
+        self._sections: list[tuple[str, str, bytes]] = []
+
+    def add_array(self, name: str, data: array | bytes) -> None:
+        """Add a typed array, or raw bytes, section."""
+
+        if len(name.encode()) > 32:
+            raise ValueError(f'Section name too long: {name}')
+        if isinstance(data, array):
+            self._sections.append((name, data.typecode, data.tobytes()))
+        else:
+            self._sections.append((name, 'B', bytes(data)))
+
+    def add_lines(self, name: str, lines) -> None:
+        """Add a string pool."""
+
+        offsets = array('I', [0])
+        chunks = []
+        total = 0
+        for line in lines:
+            b = line.encode('utf-8')
+            chunks.append(b)
+            total += len(b)
+            offsets.append(total)
+        self.add_array(f'{name}.off', offsets)
+        self.add_array(f'{name}.dat', b''.join(chunks))
+
+    def add_verse_table(self, name: str, bcv_list) -> None:
+        """Add the [book, chapter, verse] of each verse as three columns."""
+
+        for column, suffix in enumerate('bcv'):
+            self.add_array(f'{name}.{suffix}', array('H', (bcv[column] for bcv in bcv_list)))
+
+    def add_positional_index(self, name: str, r_list) -> None:
+        """Add a positional index of the words of r_list.  See search.py."""
+
+        vocabulary, token_ids, verse_of, start_of, verse_start = tokenize(r_list)
+        offsets, postings = postings_of(vocabulary, token_ids)
+        self.add_lines(f'{name}.key', (f'{word}\n' for word in vocabulary))
+        self.add_array(f'{name}.idx', offsets)
+        self.add_array(f'{name}.occ', postings)
+        self.add_array(f'{name}.tid', token_ids)
+        self.add_array(f'{name}.tvr', verse_of)
+        self.add_array(f'{name}.tof', start_of)
+        self.add_array(f'{name}.vst', verse_start)
+
+    def add_offset_map(self, name: str, verse_breaks) -> None:
+        """Add an OffsetMap from the break points of each verse."""
+
+        offsets = array('I', [0])
+        breaks = array('H')
+        for verse in verse_breaks:
+            breaks.extend(verse)
+            offsets.append(len(breaks))
+        self.add_array(f'{name}.idx', offsets)
+        self.add_array(f'{name}.brk', breaks)
+
+    def add_words(self, name: str, word_counts: dict[str, int]) -> None:
+        """Add a word count dictionary, keeping its order."""
+
+        # Words are stored one per line, so they are given a '\n' terminator.
+        self.add_lines(name, (f'{word}\n' for word in word_counts))
+        self.add_array(f'{name}.cnt', array('I', word_counts.values()))
+
+    def add_verse_lists(self, name: str, word_lists: dict[str, list], ref_dict: dict) -> None:
+        """Add a dictionary of verse number lists, keyed by the words of ref_dict.
+
+        Each list is sorted and without duplicates, as a PostingStore needs.
+        """
+
+        offsets = array('I', [0])
+        verses = array('I')
+        for word in ref_dict:
+            verses.extend(sorted(set(word_lists[word])))
+            offsets.append(len(verses))
+        self.add_lines(f'{name}.key', (f'{word}\n' for word in ref_dict))
+        self.add_array(f'{name}.idx', offsets)
+        self.add_array(f'{name}.vrs', verses)
+
+    def write(self, filename: str | Path) -> None:
+        """Write the bundle, replacing any existing file in one step."""
+
+        temp = f'{filename}.tmp'
+        with open(temp, 'wb') as f_bundle:
+            self._write(f_bundle)
+        replace(temp, filename)
+
+    def to_bytes(self) -> bytes:
+        """The bundle, as write would write it."""
+
+        f_bundle = BytesIO()
+        self._write(f_bundle)
+        return f_bundle.getvalue()
+
+    def _write(self, f_bundle) -> None:
+        pos = _HEADER.size + _ENTRY.size * len(self._sections)
+        table = []
+        for name, typecode, data in self._sections:
+            pos += -pos % _ALIGN
+            table.append(_ENTRY.pack(name.encode(), typecode.encode(), pos, len(data)))
+            pos += len(data)
+
+        f_bundle.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, byteorder[:4].encode(),
+                                    len(self._sections)))
+        f_bundle.write(b''.join(table))
+        for name, typecode, data in self._sections:
+            f_bundle.write(b'\0' * (-f_bundle.tell() % _ALIGN))
+            f_bundle.write(data)
+
+
+def is_wide(char: str) -> bool:
+    """True if char takes two columns of the display.
+
+    These are the Unicode italic letters.  Abib has always told them by
+    being above 230, which leaves out æ, and they are not ’.
+    """
+    return ord(char) > 230 and char != '’'
+
+
+def stripped_breaks(stripped: str, found: str) -> list[int]:
+    """Return the break points of a verse from the stripped to the find text.
+
+    The stripped text is the find text less its punctuation, so each
+    character of found which is not in stripped is a break point at the
+    offset in stripped of the next character which is.
+    """
+
+    breaks = []
+    j = 0
+    for i, char in enumerate(stripped):
+        while j < len(found) and found[j] != char and not found[j].isalnum():
+            breaks.append(i)
+            j += 1
+        j += 1
+
+    return breaks
+
+
+def display_breaks(found: str, shown: str) -> list[int]:
+    """Return the break points of a verse from the find text to the display.
+
+    A wide character of the display adds a column after itself.  Should
+    the display have any characters the find text has not, they add
+    theirs before the next character of found.
+    """
+
+    breaks = []
+    j = 0
+    extra = len(shown) != len(found)
+    for k, char in enumerate(found):
+        while extra and j < len(shown) and shown[j] != char and not is_wide(shown[j]) \
+                and not shown[j].isalnum():
+            breaks.extend([k] * (1 + (ord(shown[j]) > 0xFFFF)))
+            j += 1
+        if j < len(shown) and is_wide(shown[j]):
+            breaks.append(k + 1)
+        j += 1
+
+    return breaks
+
+
+def read_kjv(filename: str) -> list[str]:
+    """Read KJB_PCE.txt, less the notice of copyright."""
+
+    kjv = readio('', filename, KJB_PCE_LASTLINE)
+    try:
+        i_ = kjv.index(EOTNOC)
+    except ValueError:
+        print('Failed to find the line ', EOTNOC)
+        print('Cannot continue until this is put right.')
+        exit('Reinstalling the program should resolve this.')
+    kjv = kjv[i_ + 1:]
+
+    assert (len(kjv) == KJB_PCE_LASTLINE - 118)
+
+    return kjv
+
+
+# How to read each of BUNDLE_SOURCES.
+SOURCE_READERS: dict[str, Callable[[str], Any]] = {
+    'KJB_PCE.txt': read_kjv,
+    'Amap.txt': lambda filename: read_numbers(filename, EOF_AMAP),
+    'Info.txt': lambda filename: read_json_lines(filename, EOF_INFO),
+    'PCE-find.txt': lambda filename: readio('', filename, EOF_BIBLE_TEXT),
+    'PCE-lower.txt': lambda filename: readio('', filename, EOF_BIBLE_TEXT),
+    'PCE-stripped.txt': lambda filename: readio('', filename, EOF_BIBLE_TEXT),
+    'PCE-stripped_lower.txt': lambda filename: readio('', filename, EOF_BIBLE_TEXT),
+    'stripped_dict.txt': load_json_dict,
+    'strpd_low_dict.txt': load_json_dict,
+    'list_dict.json': load_json_dict,
+    'list_lowdict.json': load_json_dict,
+}
+
+
+def read_sources(base_dir: Path, progress: Callable[[str], None] | None = None) -> dict[str, Any]:
+    """Read and decode each of BUNDLE_SOURCES in base_dir, by name.
+
+    They don't depend on each other, so each is read in a thread of its
+    own, which overlaps the waits for a slow drive.  progress, if given,
+    is told of each as it is read, with how long it took, on the calling
+    thread.
+    """
+
+    def timed(name: str) -> tuple[Any, float]:
+        start = perf_counter()
+        return SOURCE_READERS[name](str(base_dir / name)), perf_counter() - start
+
+    sources = {}
+    with ThreadPoolExecutor(max_workers=len(SOURCE_READERS)) as pool:
+        futures = {pool.submit(timed, name): name for name in BUNDLE_SOURCES}
+        for future in as_completed(futures):
+            name = futures[future]
+            sources[name], seconds = future.result()
+            if progress is not None:
+                progress(f'Read {name} in {seconds * 1000:.0f} ms')
+
+    return sources
+
+
+def build_bundle(base_dir: Path, filename: Path,
+                 progress: Callable[[str], None] | None = None) -> None:
+    """Compile the source files in base_dir into the bundle filename.
+
+    progress, if given, is told of each step.
+    """
+
+    bundle = compile_bundle(base_dir, progress)
+    if progress is not None:
+        progress('Writing the bundle')
+    bundle.write(filename)
+
+
+def compile_bundle(base_dir: Path,
+                   progress: Callable[[str], None] | None = None) -> BundleWriter:
+    """Compile the source files in base_dir into a bundle, as build_bundle."""
+
+    def step(message: str) -> None:
+        if progress is not None:
+            progress(message)
+
+    sources = read_sources(base_dir, progress)
+
+    step('Building the bundle')
+    bundle = BundleWriter()
+    kjv = sources['KJB_PCE.txt']
+    bundle.add_lines('KJV', kjv)
+
+    amap = sources['Amap.txt']
+    bundle.add_array('Amap', amap)
+    bundle.add_verse_table('Info', sources['Info.txt'])
+
+    step('Indexing the words')
+    texts = {}
+    for name, filename_ in (('Rnew', 'PCE-find.txt'), ('Rlow', 'PCE-lower.txt'),
+                            ('Rstp', 'PCE-stripped.txt'), ('Rlsp', 'PCE-stripped_lower.txt')):
+        r_list = sources[filename_]
+        bundle.add_lines(name, r_list)
+        if name in ('Rstp', 'Rlsp'):
+            bundle.add_positional_index(f'P{name[1:]}', r_list)
+        texts[name] = r_list
+
+    # The lower case texts keep the offsets of the others, so they share the maps.
+    step('Mapping the offsets')
+    bundle.add_offset_map('Ostp', (stripped_breaks(stripped[:-1], found[:-1])
+                                   for stripped, found in zip(texts['Rstp'], texts['Rnew'])))
+    bundle.add_offset_map('Okjv', (display_breaks(found[:-1], kjv[ln][:-1])
+                                   for found, ln in zip(texts['Rnew'], amap)))
+
+    for name, dict_file, list_file in (('stripped_dict', 'stripped_dict.txt', 'list_dict.json'),
+                                       ('strpd_low_dict', 'strpd_low_dict.txt', 'list_lowdict.json')):
+        word_counts = sources[dict_file]
+        word_lists = sources[list_file]
+        bundle.add_words(name, word_counts)
+        bundle.add_verse_lists(name, word_lists, word_counts)
+
+    return bundle
+
+
+def bundle_is_stale(base_dir: Path, filename: Path) -> bool:
+    """True if the bundle is missing or older than any of its sources."""
+
+    if not filename.exists():
+        return True
+    built = path.getmtime(filename)
+    for name in BUNDLE_SOURCES:
+        source = base_dir / name
+        if source.exists() and path.getmtime(source) > built:
+            return True
+
+    return False
+
+
+def load_bundle(base_dir: Path, progress: Callable[[str], None] | None = None,
+                bundle_dir: Path | None = None) -> CorpusBundle:
+    """Open the corpus bundle of the sources in base_dir, rebuilding it first if stale.
+
+    The bundle is kept in bundle_dir, or base_dir if not given.  If it
+    can't be written there, it is built in memory.  progress, if given,
+    is told of each step of a rebuild.
+    """
+
+    filename = (bundle_dir or base_dir) / BUNDLE_NAME
+    try:
+        if bundle_is_stale(base_dir, filename):
+            print(f'Building {filename}...')
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            build_bundle(base_dir, filename, progress)
+        try:
+            return CorpusBundle(filename)
+        except BundleError as err:
+            print(f'{err} Rebuilding it.')
+            build_bundle(base_dir, filename, progress)
+            return CorpusBundle(filename)
+    except OSError as err:
+        print(f'{err}  Building the corpus in memory.')
+        return CorpusBundle(filename, compile_bundle(base_dir, progress).to_bytes())
+
+
+def read_lines(bundle_dir: Path, name: str) -> tuple[str, ...]:
+    """Return the lines of section name of the bundle in bundle_dir.
+
+    A RegexPool worker process loads its verses with this.
+    """
+
+    return CorpusBundle(bundle_dir / BUNDLE_NAME).lines(name).lines()
+
+
+def build_raw_index(bundle_dir: Path) -> None:
+    """Build the suffix arrays of Rnew and Rlow from the bundle in bundle_dir.
+
+    This takes a while, so Abib runs it in another process.
+    """
+
+    bundle = CorpusBundle(bundle_dir / BUNDLE_NAME)
+    index = BundleWriter()
+    for name in ('Rnew', 'Rlow'):
+        index.add_array(f'S{name[1:]}', suffix_array(RawText(bundle.lines(name).lines()).text))
+    index.write(bundle_dir / RAW_INDEX_NAME)
+
+
+def load_raw_index(bundle_dir: Path) -> CorpusBundle | None:
+    """Open the suffix arrays in bundle_dir, or None if they need building."""
+
+    filename = bundle_dir / RAW_INDEX_NAME
+    try:
+        if path.getmtime(filename) < path.getmtime(bundle_dir / BUNDLE_NAME):
+            return None
+        return CorpusBundle(filename)
+    except (OSError, BundleError):
+        return None
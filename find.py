@@ -121,6 +121,9 @@ class Ui_Dialog(object):
             QtWidgets.QDialogButtonBox.StandardButton.Cancel | QtWidgets.QDialogButtonBox.StandardButton.Ok)
         self.buttonBox.setProperty(".standardButtons", "")
         self.buttonBox.setObjectName("buttonBox")
+        self.status_label = QtWidgets.QLabel(Dialog)
+        self.status_label.setGeometry(QtCore.QRect(20, 340, 201, 23))
+        self.status_label.setObjectName("status_label")
         self.frame_2.raise_()
         self.frame_3.raise_()
         self.frame.raise_()
@@ -135,6 +138,7 @@ class Ui_Dialog(object):
         self.radiobutton_3.raise_()
         self.radiobutton_4.raise_()
         self.buttonBox.raise_()
+        self.status_label.raise_()
         self.label.setBuddy(self.lineEdit_1)
 
         self.retranslateUi(Dialog)
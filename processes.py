@@ -0,0 +1,66 @@
+"""
+Copyright 2025 Andrew Kingston.
+
+This file is part of Abib Bible Reader.
+
+Abib is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+Abib is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Abib.  If not, see <https://www.gnu.org/licenses/>.
+
+The corpus bundle.
+Processes for Abib's long running work: the regex search workers and
+the building of the suffix arrays.
+
+They are spawned, not forked, as Abib has threads running by the time
+they start, and forking a process with threads running can leave it
+deadlocked.  A spawned process runs the parent's main script again, as
+__mp_main__, in case what it is to run is defined there.  Nothing it
+runs is, and Abib.py imports the GUI, so the script is hidden from the
+processes as they start.  What they run must be in a module that does
+not import the GUI, as search.py and corpus.py do not.
+"""
+import sys
+from contextlib import contextmanager
+from multiprocessing import get_context
+from multiprocessing.pool import Pool
+from multiprocessing.process import BaseProcess
+from types import ModuleType
+
+_spawn = get_context('spawn')
+
+
+@contextmanager
+def _without_main():
+    """Hide the main script from the processes started within this."""
+
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+def start_pool(processes: int, initializer=None, initargs=()) -> Pool:
+    """Start a Pool of processes worker processes, each set up with initializer(*initargs)."""
+
+    with _without_main():
+        return _spawn.Pool(processes, initializer=initializer, initargs=initargs)
+
+
+def start_process(target, args=()) -> BaseProcess:
+    """Start a daemon process running target(*args), and return it."""
+
+    process = _spawn.Process(target=target, args=args, daemon=True)
+    with _without_main():
+        process.start()
+    return process
@@ -0,0 +1,1181 @@
+"""
+Copyright 2025 Andrew Kingston.
+
+This file is part of Abib Bible Reader.
+
+Abib is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+any later version.
+
+Abib is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Abib.  If not, see <https://www.gnu.org/licenses/>.
+
+Search indices for Abib.
+
+The words of PCE-stripped.txt and PCE-stripped_lower.txt are the
+whitespace separated tokens of each verse.  The whole Bible is treated
+as one stream of tokens, and each token in the stream has a global
+position, g.  For each g the index holds the token's word, its verse,
+and its start within the verse.  For each word it holds the sorted
+positions at which it occurs, its postings.  A whole word, phrase, all
+the words or any of the words search is then answered from the postings
+alone, without scanning the text of any verse.
+
+A raw search, for any string, is answered by RawText, which holds the
+verses of PCE-find.txt or PCE-lower.txt as one string, or once it has
+been built, by a SuffixArray of that string.
+
+The verses found by an any of the words search are put in order by a
+Ranking, best first, by BM25 score or by number of matches.
+
+The result of a search is a SearchResult, and the results of recent
+searches are kept in a ResultCache.
+"""
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from math import log
+from os import cpu_count
+from time import monotonic
+from heapq import heapify, heappop, merge
+from itertools import accumulate, chain, groupby
+
+from processes import start_pool
+
+_TOKEN = re.compile(r'\S+')
+
+
+def word_variants(key: str) -> list[str]:
+    """Return the words that key matches, as create_pattern does.
+
+    A plural possessive such as "sons’" also matches "son’s".
+    """
+
+    if key[-2:] == "s’":
+        return [key, f"{key[:-2]}’s"]
+    return [key]
+
+
+def tokenize(r_list) -> tuple[list[str], array, array, array, array]:
+    """Split the verses of r_list into a stream of tokens.
+
+    Return the sorted vocabulary, and for each global position the token
+    id, verse and start, and for each verse the position of its first
+    token (plus a final sentinel).
+    """
+
+    words: list[str] = []
+    verse_of = array('H')
+    start_of = array('H')
+    verse_start = array('I')
+    for x_, line in enumerate(r_list):
+        verse_start.append(len(words))
+        for m in _TOKEN.finditer(line):
+            words.append(m.group())
+            verse_of.append(x_)
+            start_of.append(m.start())
+    verse_start.append(len(words))
+
+    vocabulary = sorted(set(words))
+    ids = {word: n for n, word in enumerate(vocabulary)}
+    token_ids = array('I', (ids[word] for word in words))
+
+    return vocabulary, token_ids, verse_of, start_of, verse_start
+
+
+def postings_of(vocabulary: list[str], token_ids) -> tuple[array, array]:
+    """Return the offsets and the postings of each word in vocabulary."""
+
+    counts = [0] * (len(vocabulary) + 1)
+    for t in token_ids:
+        counts[t + 1] += 1
+    offsets = array('I', [0]) * len(counts)
+    for t in range(len(vocabulary)):
+        offsets[t + 1] = offsets[t] + counts[t + 1]
+    postings = array('I', [0]) * len(token_ids)
+    fill = array('I', offsets[:-1])
+    for g, t in enumerate(token_ids):
+        postings[fill[t]] = g
+        fill[t] += 1
+
+    return offsets, postings
+
+
+def restrict(postings, x1: int, x2: int):
+    """Return the part of the sorted postings from x1 to x2 inclusive."""
+    return postings[bisect_left(postings, x1):bisect_left(postings, x2 + 1)]
+
+
+def intersect(lists) -> array:
+    """Return the sorted values found in every one of the sorted lists.
+
+    The shortest list drives the search and gallops through the others.
+    """
+
+    lists = sorted(lists, key=len)
+    result = array('I', lists[0]) if lists else array('I')
+    for large in lists[1:]:
+        if not result:
+            break
+        found = array('I')
+        n = len(large)
+        lo = 0
+        for v in result:
+            # Double the step until past v, then bisect back to it.
+            bound = 1
+            while lo + bound < n and large[lo + bound] < v:
+                bound *= 2
+            lo = bisect_left(large, v, lo, min(lo + bound + 1, n))
+            if lo == n:
+                break
+            if large[lo] == v:
+                found.append(v)
+                lo += 1
+        result = found
+
+    return result
+
+
+def union(lists) -> array:
+    """Return the sorted values found in any of the sorted lists."""
+
+    result = array('I')
+    last = -1
+    for v in merge(*lists):
+        if v != last:
+            result.append(v)
+            last = v
+
+    return result
+
+
+class PostingStore:
+    """For each word, the sorted verse numbers of the verses containing it.
+
+    This replaces the dictionaries of sets made from list_dict.json and
+    list_lowdict.json.  Each list is a zero-copy view of a section of the
+    bundle, so nothing is built at startup.  Combine lists with intersect
+    and union rather than set operators.
+    """
+
+    def __init__(self, words: list[str], offsets, verses) -> None:
+        self._ids: dict[str, int] = {word: n for n, word in enumerate(words)}
+        self._offsets = offsets
+        self._verses = verses
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, word: str):
+        t = self._ids[word]
+        return self._verses[self._offsets[t]:self._offsets[t + 1]]
+
+    def get(self, word: str, x1: int = 0, x2: int = -1):
+        """Return the verses containing word, from x1 to x2, or an empty list."""
+
+        if word not in self._ids:
+            return self._verses[0:0]
+        postings = self[word]
+        if x2 == -1:    # To the end.
+            return postings if x1 == 0 else postings[bisect_left(postings, x1):]
+        return restrict(postings, x1, x2)
+
+
+class PositionalIndex:
+    """A positional inverted index of the words of a stripped Bible text."""
+
+    def __init__(self, vocabulary: list[str], offsets, postings, token_ids,
+                 verse_of, start_of, verse_start) -> None:
+        self.vocabulary = vocabulary
+        self._ids: dict[str, int] = {word: n for n, word in enumerate(vocabulary)}
+        self._offsets = offsets
+        self._postings = postings
+        self.token_ids = token_ids
+        self.verse_of = verse_of
+        self.start_of = start_of
+        self.verse_start = verse_start
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._ids
+
+    def token_id(self, word: str) -> int:
+        """Return the id of word, or -1 if it is not in the Bible."""
+        return self._ids.get(word, -1)
+
+    def postings(self, word: str, x1: int = 0, x2: int = -1):
+        """Return the sorted global positions of word in verses x1 to x2."""
+
+        t = self._ids.get(word)
+        if t is None:
+            return self._postings[0:0]
+        p = self._postings[self._offsets[t]:self._offsets[t + 1]]
+        if x1 > 0 or x2 != -1:
+            g1 = self.verse_start[x1]
+            g2 = self.verse_start[x2 + 1] if x2 != -1 else len(self.token_ids)
+            p = p[bisect_left(p, g1):bisect_left(p, g2)]
+        return p
+
+    def count(self, word: str) -> int:
+        """The number of times word occurs."""
+
+        t = self._ids.get(word)
+        return 0 if t is None else self._offsets[t + 1] - self._offsets[t]
+
+    def prefix_range(self, prefix: str) -> tuple[int, int]:
+        """The range of ids of the words that begin with prefix."""
+
+        lo = bisect_left(self.vocabulary, prefix)
+        return lo, bisect_left(self.vocabulary, prefix + '\U0010ffff', lo)
+
+    def prefix_count(self, prefix: str, x1: int = 0, x2: int = -1) -> int:
+        """The number of times words that begin with prefix occur in verses x1 to x2.
+
+        The postings are grouped by id, in the order of the vocabulary, so
+        over the whole Bible this is a difference of two offsets.
+        """
+
+        lo, hi = self.prefix_range(prefix)
+        if x1 == 0 and x2 == -1:
+            return self._offsets[hi] - self._offsets[lo]
+        g1 = self.verse_start[x1]
+        g2 = self.verse_start[x2 + 1] if x2 != -1 else len(self.token_ids)
+        postings = self._postings
+        n = 0
+        for t in range(lo, hi):
+            a, b = self._offsets[t], self._offsets[t + 1]
+            n += bisect_left(postings, g2, a, b) - bisect_left(postings, g1, a, b)
+        return n
+
+    def spans(self, words: list[str], x1: int, x2: int, slop: int = 0) -> list[tuple[int, int, int]]:
+        """Return (verse, start, end) of each occurrence of the phrase words.
+
+        The words must be tokens of one verse, in order.  With slop 0 they
+        must be consecutive; otherwise up to slop other tokens in all may
+        come between them.  Variants of the first and last word, as
+        word_variants, also match.  The spans are sorted by verse, then
+        start.
+
+        The rarest word drives the search: for each of its postings the
+        other words are looked for next to it in the token stream.
+        """
+
+        n = len(words)
+        ids: list[set[int]] = []
+        for i, word in enumerate(words):
+            variants = word_variants(word) if i in (0, n - 1) else [word]
+            ids.append({t for t in map(self.token_id, variants) if t != -1})
+            if not ids[-1]:
+                return []
+        rarest = min(range(n), key=lambda i: sum(self._count_of(t) for t in ids[i]))
+        token_ids = self.token_ids
+        verse_of = self.verse_of
+        g1 = self.verse_start[x1]
+        g2 = self.verse_start[x2 + 1] if x2 != -1 else len(token_ids)
+        hits = set()
+        for t in ids[rarest]:
+            p = self._postings[self._offsets[t]:self._offsets[t + 1]]
+            for g in p[bisect_left(p, g1):bisect_left(p, g2)]:
+                x_ = verse_of[g]
+                budget = slop
+                # Nearest earlier words, going back from the rarest one.
+                first = g
+                for i in range(rarest - 1, -1, -1):
+                    pos = first - 1
+                    while pos >= g1 and pos >= first - 1 - budget and verse_of[pos] == x_:
+                        if token_ids[pos] in ids[i]:
+                            break
+                        pos -= 1
+                    else:
+                        break
+                    budget -= first - 1 - pos
+                    first = pos
+                else:
+                    # Nearest later words, going on from the rarest one.
+                    last = g
+                    for i in range(rarest + 1, n):
+                        pos = last + 1
+                        while pos < g2 and pos <= last + 1 + budget and verse_of[pos] == x_:
+                            if token_ids[pos] in ids[i]:
+                                break
+                            pos += 1
+                        else:
+                            break
+                        budget -= pos - last - 1
+                        last = pos
+                    else:
+                        hits.add((x_, self.start_of[first], self.end_of(last)))
+
+        return sorted(hits)
+
+    def _count_of(self, t: int) -> int:
+        """The number of times the word with id t occurs."""
+        return self._offsets[t + 1] - self._offsets[t]
+
+    def end_of(self, g: int) -> int:
+        """The end of the token at global position g within its verse."""
+        return self.start_of[g] + len(self.vocabulary[self.token_ids[g]])
+
+    def verse_spans(self, words: list[str], x1: int, x2: int,
+                    slop: int = 0) -> dict[int, list[tuple[int, int]]]:
+        """Return the (start, end) of each occurrence of the phrase words, by verse."""
+
+        by_verse: dict[int, list[tuple[int, int]]] = {}
+        for x_, start, end in self.spans(words, x1, x2, slop):
+            by_verse.setdefault(x_, []).append((start, end))
+        return by_verse
+
+
+def bm25(index: PositionalIndex, found: list[dict], verse_counts: list[int],
+         k1: float = 1.2, b: float = 0.75) -> dict[int, float]:
+    """Score verses for an any of the words search by Okapi BM25.
+
+    found holds, for each word, the verses it was found in, with where;
+    verse_counts holds, for each word, the number of verses in the whole
+    Bible that have it.  A word found in few verses counts for more, as
+    does a word found more often in a verse, and in a shorter one.
+    """
+
+    verse_start = index.verse_start
+    n = len(verse_start) - 1
+    average = len(index.token_ids) / n
+    scores: dict[int, float] = {}
+    for by_verse, df in zip(found, verse_counts):
+        idf = log(1 + (n - df + 0.5) / (df + 0.5))
+        for x_, spans in by_verse.items():
+            tf = len(spans)
+            length = verse_start[x_ + 1] - verse_start[x_]
+            score = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / average))
+            scores[x_] = scores.get(x_, 0.0) + score
+    return scores
+
+
+class Ranking:
+    """The verses of scores, best first, and those scoring the same in verse order.
+
+    The verses are kept in a heap and taken from it a page at a time, as
+    far as they are asked for, so only the pages looked at are sorted.
+    """
+
+    def __init__(self, scores: dict[int, float], page: int = 20) -> None:
+        self._heap = [(-score, x_) for x_, score in scores.items()]
+        heapify(self._heap)
+        self._ranked: list[int] = []
+        self._len = len(self._heap)
+        self.page = page
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError('Ranking index out of range')
+        if i >= len(self._ranked):
+            self._rank(i + 1)
+        return self._ranked[i]
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self[i]
+
+    def _rank(self, n: int) -> None:
+        """Take verses from the heap, a whole number of pages, until n are ranked."""
+
+        heap, ranked = self._heap, self._ranked
+        n = min(self._len, -(-n // self.page) * self.page)
+        while len(ranked) < n:
+            ranked.append(heappop(heap)[1])
+
+
+class Ranked:
+    """values[x_] for each verse x_ of a Ranking, in its order."""
+
+    def __init__(self, ranking: Ranking, values: dict) -> None:
+        self.ranking = ranking
+        self.values = values
+        self.matches = sum(len(i) for i in values.values())
+
+    def __len__(self) -> int:
+        return len(self.ranking)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.values[x_] for x_ in self.ranking[i]]
+        return self.values[self.ranking[i]]
+
+    def __iter__(self):
+        for x_ in self.ranking:
+            yield self.values[x_]
+
+
+class TypedPhrase:
+    """Count the occurrences of a phrase while it is being typed.
+
+    The words typed so far must match whole words, and the last, which may
+    be unfinished, any word it begins.  As for a phrase searched for, the
+    first and last words also match their word_variants.  When the phrase
+    only grows, the occurrences found for it before are narrowed down
+    rather than searched for again, so each key press costs little.
+    """
+
+    def __init__(self, index: PositionalIndex) -> None:
+        self.index = index
+        self._stem: list[str] = []
+        self._starts = None     # Where the words but the last occur; None if there are none.
+        self._prefix = ''
+        self._prefix_starts = None   # Where the words and then the prefix occur.
+
+    def count(self, words: list[str], prefix: str, x1: int = 0, x2: int = -1) -> int:
+        """The number of occurrences in verses x1 to x2 of words, then a word beginning prefix."""
+
+        index = self.index
+        # The words before the last, which are matched as they are, but
+        # for variants of the first.
+        stem = words if prefix else words[:-1]
+        if stem != self._stem:
+            done = len(self._stem)
+            if self._stem and stem[:done] == self._stem:
+                starts = self._starts
+            else:
+                done = 1
+                starts = list(merge(*(index.postings(word) for word in word_variants(stem[0])))) \
+                    if stem else None
+            for j in range(done, len(stem)):
+                t = index.token_id(stem[j])
+                starts = self._follow(starts, j, range(t, t + 1)) if t != -1 else []
+            self._stem = stem
+            self._starts = starts
+            self._prefix = ''
+
+        if not prefix:
+            if not words:
+                return 0
+            if self._starts is None:
+                return sum(len(index.postings(word, x1, x2)) for word in word_variants(words[0]))
+            ids = {t for t in map(index.token_id, word_variants(words[-1])) if t != -1}
+            starts = self._follow(self._starts, len(stem), ids)
+        elif self._starts is None:
+            return sum(index.prefix_count(word, x1, x2) for word in word_variants(prefix))
+        else:
+            variants = word_variants(prefix)
+            if self._prefix and prefix.startswith(self._prefix) and len(variants) == 1:
+                starts = self._prefix_starts
+            else:
+                starts = self._starts
+            ranges = [range(*index.prefix_range(word)) for word in variants]
+            ids = ranges[0] if len(ranges) == 1 else set(chain(*ranges))
+            starts = self._follow(starts, len(stem), ids)
+            self._prefix = prefix
+            self._prefix_starts = starts
+
+        if x1 == 0 and x2 == -1:
+            return len(starts)
+        g1 = index.verse_start[x1]
+        g2 = index.verse_start[x2 + 1] if x2 != -1 else len(index.token_ids)
+        return bisect_left(starts, g2) - bisect_left(starts, g1)
+
+    def _follow(self, starts, j: int, ids) -> list[int]:
+        """The starts whose token j on, in the same verse, has an id in ids."""
+
+        token_ids = self.index.token_ids
+        verse_of = self.index.verse_of
+        n = len(token_ids)
+        return [g for g in starts
+                if g + j < n and token_ids[g + j] in ids and verse_of[g + j] == verse_of[g]]
+
+
+class RawText:
+    """The verses of a Bible text as one string, for raw searches.
+
+    verse_start[x_] is the offset of verse x_ within text, and the final
+    entry is the length of text.  Each verse keeps its newline, so no
+    match can run on from one verse into the next.
+    """
+
+    __slots__ = ('text', 'verse_start')
+
+    def __init__(self, r_list) -> None:
+        self.text: str = ''.join(r_list)
+        self.verse_start = array('I', accumulate(map(len, r_list), initial=0))
+
+    def bounds(self, x1: int, x2: int) -> tuple[int, int]:
+        """The offsets in text of verses x1 to x2 inclusive."""
+
+        end = self.verse_start[-1] if x2 == -1 else self.verse_start[x2 + 1]
+        return self.verse_start[x1], end
+
+    def hits(self, key: str, x1: int = 0, x2: int = -1):
+        """Yield (verse, offset within the verse, ordinal) of each match of key.
+
+        Matches are found in verses x1 to x2 inclusive.  They may overlap,
+        as each search starts one character after the previous match.
+        The ordinal counts the matches from 1.
+        """
+
+        if not key:
+            return
+        text = self.text
+        start, end = self.bounds(x1, x2)
+
+        def found():
+            p = text.find(key, start, end)
+            while p != -1:
+                yield p
+                p = text.find(key, p + 1, end)
+
+        yield from self.locate(found(), x1)
+
+    def locate(self, offsets, x1: int = 0):
+        """Yield (verse, offset within the verse, ordinal) for the sorted offsets.
+
+        The offsets are in text, and none comes before verse x1.
+        """
+
+        verse_start = self.verse_start
+        x_ = x1
+        next_verse = verse_start[x_ + 1]
+        for ordinal, p in enumerate(offsets, 1):
+            if p >= next_verse:
+                x_ = bisect_right(verse_start, p, x_ + 1) - 1
+                next_verse = verse_start[x_ + 1]
+            yield x_, p - verse_start[x_], ordinal
+
+    def regex(self, pattern: re.Pattern, x1: int = 0, x2: int = -1, verses=None):
+        """Yield (verse, [(start, end), ...]) for each verse matching pattern.
+
+        All of verses x1 to x2 are scanned in one pass, unless verses, the
+        sorted verses that can match, is given.  A match may not run on
+        into the next verse; the verse it starts in is then searched alone.
+        The verses are yielded in order, as soon as each is complete.
+        """
+
+        text = self.text
+        verse_start = self.verse_start
+
+        def search_verse(x_: int) -> list[tuple[int, int]]:
+            s = verse_start[x_]
+            return [(m.start() - s, m.end() - s)
+                    for m in pattern.finditer(text, s, verse_start[x_ + 1])]
+
+        if verses is not None:
+            for x_ in verses:
+                spans = search_verse(x_)
+                if spans:
+                    yield x_, spans
+            return
+
+        start, end = self.bounds(x1, x2)
+        x_ = x1
+        pending: list[tuple[int, int]] = []  # The matches so far in verse x_.
+        matches = pattern.finditer(text, start, end)
+        m = next(matches, None)
+        while m is not None:
+            a, b = m.span()
+            if a == end:
+                # An empty match after the last verse.
+                break
+            if a >= verse_start[x_ + 1]:
+                if pending:
+                    yield x_, pending
+                    pending = []
+                x_ = bisect_right(verse_start, a, x_ + 1) - 1
+            if b > verse_start[x_ + 1]:
+                # The match runs into the next verse.
+                pending = search_verse(x_)
+                if pending:
+                    yield x_, pending
+                    pending = []
+                x_ += 1
+                matches = pattern.finditer(text, verse_start[x_], end)
+            else:
+                pending.append((a - verse_start[x_], b - verse_start[x_]))
+            m = next(matches, None)
+        if pending:
+            yield x_, pending
+
+    def count(self, key: str, x1: int = 0, x2: int = -1) -> int:
+        """The number of matches of key in verses x1 to x2, as hits yields."""
+
+        if not key:
+            return 0
+        text = self.text
+        start, end = self.bounds(x1, x2)
+        if not any(key[:i] == key[-i:] for i in range(1, len(key))):
+            # No two matches of key can overlap, so str.count agrees.
+            return text.count(key, start, end)
+        n = 0
+        p = text.find(key, start, end)
+        while p != -1:
+            n += 1
+            p = text.find(key, p + 1, end)
+        return n
+
+
+@lru_cache(maxsize=64)
+def compile_regex(key: str, ignore_case: bool) -> re.Pattern:
+    """Compile the regex key, for searching verses joined into one string.
+
+    The compiled patterns are kept from one search to the next.  A bad
+    key raises re.error, which is not cached.
+    """
+
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    return re.compile(key, flags)
+
+
+class SearchLimit(Exception):
+    """A regex search was refused, or stopped at its time or match limit."""
+
+
+def nested_quantifier(key: str) -> bool:
+    """True if the regex key repeats a group that itself has an unbounded repeat.
+
+    Patterns such as (a+)+ or (\\w+\\s?)* can take exponential time to
+    fail, so they are refused before they are run.
+    """
+
+    stack = [False]  # For each open group, whether it holds *, + or {n,}.
+    i = 0
+    while i < len(key):
+        c = key[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            i = _class_end(key, i)
+        elif c == '(':
+            stack.append(False)
+        elif c == ')' and len(stack) > 1:
+            inner = stack.pop()
+            unbounded = _unbounded(key, i + 1)
+            if inner and unbounded:
+                return True
+            stack[-1] = stack[-1] or inner or unbounded
+        elif _unbounded(key, i):
+            stack[-1] = True
+        i += 1
+
+    return False
+
+
+def _class_end(key: str, i: int) -> int:
+    """The index of the ] that ends the class opened by the [ at key[i].
+
+    A ] first in the class, after any ^, is a literal.
+    """
+
+    i += 2 if key[i + 1:i + 2] == '^' else 1
+    if key[i:i + 1] == ']':
+        i += 1
+    while i < len(key) and key[i] != ']':
+        i += 2 if key[i] == '\\' else 1
+    return i
+
+
+def _unbounded(key: str, i: int) -> bool:
+    """True if key[i:] starts with *, + or {n,}."""
+
+    if key[i:i + 1] in ('*', '+'):
+        return True
+    return re.match(r'\{\d*,\}', key[i:i + 8]) is not None
+
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+
+
+@lru_cache(maxsize=64)
+def regex_words(key: str) -> tuple[str, ...]:
+    """Return whole words that every match of the regex key must contain.
+
+    Only runs of plain characters outside any group, class, alternation
+    or quantifier are looked at, and of those only the words with a space
+    on each side.  Such a word is then a word of the verse, so the word
+    index can rule out the verses without it.  An empty tuple means no
+    verse can be ruled out.
+    """
+
+    if '|' in key or re.compile(key).flags & re.VERBOSE:
+        return ()
+    runs: list[str] = []
+    run = ''
+    i = 0
+    while i < len(key):
+        c = key[i]
+        if c == '\\' and i + 1 < len(key):
+            d = key[i + 1]
+            i += 2
+            if d in _ESCAPES or not d.isalnum():
+                run += _ESCAPES.get(d, d)
+                continue
+            runs.append(run)
+            run = ''
+            continue
+        if c in '*?{':
+            # The character before may be left out.
+            run = run[:-1]
+        elif c == '+':
+            pass
+        elif c == '[':
+            i = _class_end(key, i)
+        elif c == '(':
+            # Skip to the end of the group, and any classes in it.
+            depth = 0
+            while i < len(key):
+                if key[i] == '\\':
+                    i += 1
+                elif key[i] == '[':
+                    i = _class_end(key, i)
+                elif key[i] == '(':
+                    depth += 1
+                elif key[i] == ')':
+                    depth -= 1
+                    if depth <= 0:
+                        break
+                i += 1
+        elif c not in '.^$':
+            run += c
+            i += 1
+            continue
+        if c == '{':
+            i = key.find('}', i) if '}' in key[i:] else len(key)
+        runs.append(run)
+        run = ''
+        i += 1
+    runs.append(run)
+
+    words = []
+    for run in runs:
+        words.extend(word for word in run.split(' ')[1:-1] if word.isalpha())
+    return tuple(dict.fromkeys(words))
+
+
+# The text a RegexPool worker process searches, loaded once by _init_shard.
+_shard_text: RawText | None = None
+
+
+def _init_shard(load, *args) -> None:
+    """Load the verses of a RegexPool worker process, as load(*args)."""
+
+    global _shard_text  # Needed because of assignment.
+    _shard_text = RawText(load(*args))
+
+
+def _regex_shard(key: str, ignore_case: bool, x1: int, x2: int, verses=None) -> list:
+    """Search verses x1 to x2, or just verses, for the regex key, in a worker process."""
+    return list(_shard_text.regex(compile_regex(key, ignore_case), x1, x2, verses))
+
+
+class RegexPool:
+    """Search for a regex in shards of the Bible, one shard per process.
+
+    Each worker process loads the verses once, with load(*args), which
+    must be a module level function so that it can be sent to a new
+    process.  The processes are started with the first search; see
+    processes.py.  A search that runs too long is stopped by ending the
+    processes, as a regex match cannot be interrupted.  One that is
+    cancelled is left to finish, and the next search waits a little for
+    it, so that the processes can be used again, before ending them.
+    """
+
+    STALE_WAIT = 0.5  # Seconds to wait for the tasks of a cancelled search.
+
+    def __init__(self, load, *args, workers: int | None = None) -> None:
+        self.workers = workers or cpu_count() or 1
+        self._initargs = (load,) + args
+        self._pool = None
+        self._stale: list = []  # The unfinished tasks of cancelled searches.
+
+    def shards(self, x1: int, x2: int, book_bounds: list[int]) -> list[tuple[int, int]]:
+        """Split verses x1 to x2 into about two shards per worker, at the start of books."""
+
+        size = (x2 - x1 + 1) / (2 * self.workers)
+        shards = []
+        a = x1
+        for b in book_bounds:
+            if b - a >= size and b <= x2:
+                shards.append((a, b - 1))
+                a = b
+        shards.append((a, x2))
+        return shards
+
+    def regex(self, key: str, ignore_case: bool, x1: int, x2: int, book_bounds: list[int],
+              verses=None, time_limit: float = 0, cancelled=None):
+        """Yield (verse, [(start, end), ...]) for each verse matching the regex key.
+
+        Verses x1 to x2 are searched in shards; or if verses, the sorted
+        verses that can match, is given, just those, in one piece.  The
+        verses are yielded in order, a shard at a time.  After time_limit
+        seconds, if not 0, SearchLimit is raised.  The search stops early,
+        without an error, once cancelled() is true.
+        """
+
+        self._settle()
+        if self._pool is None:
+            self._pool = start_pool(self.workers, _init_shard, self._initargs)
+        if verses is not None:
+            tasks = [(key, ignore_case, x1, x2, list(verses))]
+        else:
+            tasks = [(key, ignore_case, a, b) for a, b in self.shards(x1, x2, book_bounds)]
+        results = [self._pool.apply_async(_regex_shard, task) for task in tasks]
+        deadline = monotonic() + time_limit if time_limit else None
+        timed_out = False
+        try:
+            for result in results:
+                while not result.ready():
+                    result.wait(0.05)
+                    if cancelled is not None and cancelled():
+                        return
+                    if deadline is not None and monotonic() > deadline:
+                        timed_out = True
+                        raise SearchLimit(f'Regex search stopped after {time_limit:g} seconds.')
+                yield from result.get()
+        finally:
+            if timed_out:
+                # Stop the workers still searching.
+                self.shutdown()
+            else:
+                self._stale = [result for result in results if not result.ready()]
+
+    def _settle(self) -> None:
+        """Wait up to STALE_WAIT for the tasks of cancelled searches, else end the processes."""
+
+        deadline = monotonic() + self.STALE_WAIT
+        for result in self._stale:
+            result.wait(max(0.0, deadline - monotonic()))
+        if not all(result.ready() for result in self._stale):
+            self.shutdown()
+        self._stale = []
+
+    def shutdown(self) -> None:
+        """End the worker processes."""
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self._stale = []
+
+
+def suffix_array(text: str, k: int = 32) -> array:
+    """Return the start of each suffix of text, in the sorted order of the suffixes.
+
+    The suffixes are first sorted on their first k characters.  Each run
+    of suffixes still tied after h characters is then sorted on the rank
+    of the suffix h characters further on, doubling h, until no ties are
+    left.  Only the runs still tied are sorted again.
+    """
+
+    n = len(text)
+    buckets: dict[str, list[int]] = {}
+    for p, c in enumerate(text):
+        buckets.setdefault(c, []).append(p)
+    sa: list[int] = []
+    for c in sorted(buckets):
+        # A bucket at a time, to keep down the memory the keys take.
+        sa.extend(sorted(buckets.pop(c), key=lambda p: text[p:p + k]))
+
+    rank = array('i', [0]) * n
+    ties: list[tuple[int, int]] = []
+    i = 0
+    for _, run in groupby(sa, key=lambda p: text[p:p + k]):
+        run = list(run)
+        for p in run:
+            rank[p] = i
+        if len(run) > 1:
+            ties.append((i, i + len(run)))
+        i += len(run)
+
+    h = k
+    while ties:
+        def key(p: int) -> int:
+            return rank[p + h] if p + h < n else -1
+
+        refined: list[tuple[int, list[int]]] = []
+        for a, b in ties:
+            run_ = sorted(sa[a:b], key=key)
+            sa[a:b] = run_
+            for _, run in groupby(run_, key=key):
+                run = list(run)
+                refined.append((a, run))
+                a += len(run)
+        # The ranks change only once every tie of this round is sorted.
+        ties = []
+        for a, run in refined:
+            for p in run:
+                rank[p] = a
+            if len(run) > 1:
+                ties.append((a, a + len(run)))
+        h *= 2
+
+    return array('I', sa)
+
+
+class SuffixArray:
+    """A suffix array of the text of a RawText, for raw searches.
+
+    It answers the same count and hits queries as RawText, but finds the
+    matches of a key by binary search, in time that depends on the length
+    of the key rather than the length of the Bible.
+    """
+
+    __slots__ = ('raw', 'sa')
+
+    def __init__(self, raw: RawText, sa) -> None:
+        self.raw = raw
+        self.sa = sa
+
+    def _range(self, key: str) -> tuple[int, int]:
+        """The range of sa whose suffixes start with key."""
+
+        text = self.raw.text
+        m = len(key)
+
+        def prefix(p: int) -> str:
+            return text[p:p + m]
+
+        lo = bisect_left(self.sa, key, key=prefix)
+        return lo, bisect_right(self.sa, key, lo, key=prefix)
+
+    def _offsets(self, key: str, x1: int, x2: int) -> list[int]:
+        """The sorted offsets in text of the matches of key in verses x1 to x2."""
+
+        lo, hi = self._range(key)
+        start, end = self.raw.bounds(x1, x2)
+        end -= len(key)     # As str.find, a match must end by the end.
+        return sorted(p for p in self.sa[lo:hi] if start <= p <= end)
+
+    def hits(self, key: str, x1: int = 0, x2: int = -1):
+        """Yield (verse, offset within the verse, ordinal) of each match of key."""
+
+        if key:
+            yield from self.raw.locate(self._offsets(key, x1, x2), x1)
+
+    def regex(self, pattern: re.Pattern, x1: int = 0, x2: int = -1, verses=None):
+        """As RawText.regex, which a suffix array cannot speed up."""
+        return self.raw.regex(pattern, x1, x2, verses)
+
+    def count(self, key: str, x1: int = 0, x2: int = -1) -> int:
+        """The number of matches of key in verses x1 to x2, as hits yields."""
+
+        if not key:
+            return 0
+        lo, hi = self._range(key)
+        start, end = self.raw.bounds(x1, x2)
+        if start == 0 and end == len(self.raw.text):
+            return hi - lo
+        end -= len(key)
+        return sum(1 for p in self.sa[lo:hi] if start <= p <= end)
+
+
+class SearchResult:
+    """The result of one search, and which of its hits is being looked at.
+
+    The hits are numbered from 0.  Those of a whole word, phrase or regex
+    search are its matches: spans[i] holds the (start, end) of those in
+    verse verses[i].  Those of an all or any of the words search, by_verse,
+    are the verses.  A raw search has no spans; its matches are taken from
+    hits, a generator of (verse, offset, ordinal), only as far as they are
+    visited.  Either way total, the number of hits, is known at once.
+    scope is the (x1, x2) of the verses searched, when it is known.
+    """
+
+    __slots__ = ('key', 'label', 'checks', 'verses', 'spans', 'by_verse', 'total', 'current',
+                 'scope', '_hits', '_visited', '_index', '_first', '_where')
+
+    def __init__(self, key: str, label: str, checks: tuple, verses=None, spans=None,
+                 by_verse: bool = False, total: int | None = None, hits=None) -> None:
+        self.key = key          # As searched for.
+        self.label = label      # As shown in the status bar.
+        self.checks = checks    # The Find dialog's checks.
+        self.verses = [] if verses is None else verses
+        self.spans = [] if spans is None else spans
+        self.by_verse = by_verse
+        if total is None:
+            total = len(self.verses) if by_verse else sum(len(i) for i in self.spans)
+        self.total = total
+        self.current = -1       # The hit being looked at, -1 before the first.
+        self.scope: tuple[int, int] | None = None
+        self._hits = hits
+        self._visited: list[tuple[int, int]] = []
+        self._index = None      # For each hit, its index in verses.
+        self._first = None      # For each verse, the number of its first hit.
+        self._where = None      # For each verse, its index in verses.
+
+    def __len__(self) -> int:
+        return self.total
+
+    def add(self, x_: int, spans: list[tuple[int, int]]) -> None:
+        """Add the hits spans in verse x_, after those already found."""
+
+        self.verses.append(x_)
+        self.spans.append(spans)
+        self.total += 1 if self.by_verse else len(spans)
+        self._where = None
+
+    def hit(self, n: int) -> tuple[int, int, int]:
+        """Make hit n the current one.  Return its verse, and its start and end in it.
+
+        A hit of a by_verse result runs from the first of its verse's
+        matches to the last.
+        """
+
+        if not 0 <= n < self.total:
+            raise IndexError('SearchResult hit out of range')
+        if self._hits is not None:
+            visited = self._visited
+            while len(visited) <= n:
+                x_, start, _ = next(self._hits)
+                visited.append((x_, start))
+            x_, start = visited[n]
+            end = start + len(self.key)
+        elif self.by_verse:
+            spans = sorted(self.spans[n])
+            x_, start, end = self.verses[n], spans[0][0], spans[-1][1]
+        else:
+            i = self.verse_index(n)
+            x_ = self.verses[i]
+            start, end = self.spans[i][n - self._first[i]]
+        self.current = n
+        return x_, start, end
+
+    def next(self) -> tuple[int, int, int] | None:
+        """Go on to the next hit, as hit does, or return None after the last."""
+        return self.hit(self.current + 1) if self.current + 1 < self.total else None
+
+    def previous(self) -> tuple[int, int, int] | None:
+        """Go back to the previous hit, as hit does, or return None before the first."""
+        return self.hit(self.current - 1) if self.current > 0 else None
+
+    def verse_index(self, n: int) -> int:
+        """The index in verses of the verse of hit n.
+
+        For matches, a table of the verse of each hit is made the first
+        time, after which it is a lookup.
+        """
+
+        if self.by_verse:
+            return n
+        if self._index is None:
+            index = array('I')
+            first = array('I')
+            for i, spans in enumerate(self.spans):
+                first.append(len(index))
+                index.extend([i] * len(spans))
+            self._index, self._first = index, first
+        return self._index[n]
+
+    def current_spans(self) -> list[tuple[int, int]]:
+        """The (start, end) of the matches in the current hit's verse."""
+        return self.spans[self.verse_index(self.current)] if self.current >= 0 else []
+
+    def spans_in(self, x_: int) -> list[tuple[int, int]] | None:
+        """The (start, end) of the matches in verse x_, or None if they are not kept.
+
+        A raw result keeps none.  Otherwise a table of where each verse is
+        in verses is made the first time, after which it is a lookup.
+        """
+
+        if self._hits is not None:
+            return None
+        if self.scope is not None and not self.scope[0] <= x_ <= self.scope[1]:
+            return []
+        if isinstance(self.spans, Ranked):
+            return self.spans.values.get(x_, [])
+        if self._where is None:
+            self._where = {verse: i for i, verse in enumerate(self.verses)}
+        i = self._where.get(x_)
+        return [] if i is None else self.spans[i]
+
+    def narrow(self, x1: int, x2: int) -> "SearchResult":
+        """A new result with the hits in verses x1 to x2, in the same order."""
+
+        keep = [i for i, x_ in enumerate(self.verses) if x1 <= x_ <= x2]
+        result = SearchResult(self.key, self.label, self.checks, [self.verses[i] for i in keep],
+                              [self.spans[i] for i in keep], self.by_verse)
+        result.scope = (x1, x2)
+        return result
+
+    def size(self) -> int:
+        """Roughly how many bytes the result takes."""
+
+        matches = getattr(self.spans, 'matches', None)
+        if matches is None:
+            matches = sum(len(i) for i in self.spans)
+        return 100 * (len(self.verses) + matches) + 500
+
+
+class ResultCache:
+    """The results of recent searches, up to max_bytes of them.
+
+    A result is stored under its query and the verses x1 to x2 searched.
+    A search of fewer verses than a stored result covers is answered by
+    narrowing that result, when a narrow function is given.  Once full,
+    the result used least recently is dropped first.  hits, narrowed and
+    misses count how each search was answered, to help set max_bytes.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.narrowed = 0
+        self.misses = 0
+        self._results: OrderedDict = OrderedDict()  # (query, x1, x2): (result, size)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def get(self, query, x1: int, x2: int, narrow=None):
+        """The result of query over verses x1 to x2, or None if it is not known.
+
+        narrow(result, x1, x2) makes it from a result over more verses.
+        """
+
+        key = (query, x1, x2)
+        entry = self._results.get(key)
+        if entry is None and narrow is not None:
+            for wider in reversed(self._results):
+                if wider[0] == query and wider[1] <= x1 and x2 <= wider[2]:
+                    self._results.move_to_end(wider)
+                    self.narrowed += 1
+                    return narrow(self._results[wider][0], x1, x2)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, query, x1: int, x2: int, result, size: int) -> None:
+        """Store the result of query over verses x1 to x2, which takes about size bytes."""
+
+        key = (query, x1, x2)
+        if key in self._results:
+            self.size -= self._results.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._results[key] = (result, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            self.size -= self._results.popitem(last=False)[1][1]
+
+    def clear(self) -> None:
+        self._results.clear()
+        self.size = 0
+
+    def __repr__(self) -> str:
+        return (f'ResultCache({len(self)} results, {self.size}/{self.max_bytes} bytes, '
+                f'{self.hits} hits, {self.narrowed} narrowed, {self.misses} misses)')
@@ -0,0 +1,143 @@
+"""
+Fixtures for the tests: a corpus made from the files shipped with Abib.
+
+KJB_PCE.txt, PCE-find.txt, PCE-lower.txt and the JSON verse lists are
+not in the repository, so they are made here: the find texts are the
+stripped ones, and the display has each verse on the line Amap gives it,
+with blank lines between.
+"""
+import os
+import shutil
+import sys
+from collections import defaultdict
+from json import dump, load
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO))
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def make_corpus(base_dir: Path) -> None:
+    """Write the source files of a corpus bundle to base_dir."""
+
+    from corpus import (EOF_AMAP, EOF_BIBLE_TEXT, EOTNOC, KJB_PCE_LASTLINE, read_lines_of,
+                        read_numbers)
+
+    for name in ('Amap.txt', 'Info.txt', 'PCE-stripped.txt', 'PCE-stripped_lower.txt',
+                 'stripped_dict.txt', 'strpd_low_dict.txt', 'morning_evening.json'):
+        shutil.copy(REPO / name, base_dir / name)
+    shutil.copy(REPO / 'PCE-stripped.txt', base_dir / 'PCE-find.txt')
+    shutil.copy(REPO / 'PCE-stripped_lower.txt', base_dir / 'PCE-lower.txt')
+
+    verses = read_lines_of(str(REPO / 'PCE-stripped.txt'), EOF_BIBLE_TEXT)
+    kjv = [' \n'] * (KJB_PCE_LASTLINE - 118)
+    for x_, ln in enumerate(read_numbers(str(REPO / 'Amap.txt'), EOF_AMAP)):
+        kjv[ln] = verses[x_]
+    notice = ['notice\n'] * 117 + [EOTNOC]
+    (base_dir / 'KJB_PCE.txt').write_text(''.join(notice + kjv), encoding='utf-8')
+
+    for text, dict_file, list_file in (('PCE-stripped.txt', 'stripped_dict.txt', 'list_dict.json'),
+                                       ('PCE-stripped_lower.txt', 'strpd_low_dict.txt',
+                                        'list_lowdict.json')):
+        lists = defaultdict(list)
+        for x_, line in enumerate(read_lines_of(str(REPO / text), EOF_BIBLE_TEXT)):
+            for word in set(line.split()):
+                lists[word].append(x_)
+        with open(REPO / dict_file, encoding='utf-8') as file:
+            words = load(file)
+        with open(base_dir / list_file, 'w', encoding='utf-8') as file:
+            dump({word: lists.get(word, []) for word in words}, file)
+
+
+@pytest.fixture(scope='session')
+def corpus_dir(tmp_path_factory) -> Path:
+    """A directory with the sources of a corpus, and its bundle built."""
+
+    from corpus import load_bundle
+
+    base_dir = tmp_path_factory.mktemp('corpus')
+    make_corpus(base_dir)
+    load_bundle(base_dir)
+
+    return base_dir
+
+
+@pytest.fixture(scope='session')
+def app():
+    """The QApplication, or a skip if PySide6 is not installed."""
+
+    QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def wait(app, done, timeout: float = 60) -> None:
+    """Process events until done() is true."""
+
+    from time import perf_counter
+
+    start = perf_counter()
+    while not done():
+        assert perf_counter() - start < timeout, 'timed out'
+        app.processEvents()
+    app.processEvents()
+
+
+@pytest.fixture(scope='session')
+def main_window(app, corpus_dir, tmp_path_factory):
+    """Abib's MainWindow on the corpus, set up as its __main__ block does.
+
+    The constants of that block are copied from its source, and the search
+    data is loaded.
+    """
+
+    import ast
+    from time import perf_counter
+
+    import Abib
+    from corpus import BlockMap, load_bundle, read_lines
+    from search import RegexPool, ResultCache
+
+    g = vars(Abib)
+    bundle = load_bundle(corpus_dir)
+    g.update(started=perf_counter(), splash=None, settings={}, bundle=bundle, base_dir=corpus_dir,
+             bundle_dir=corpus_dir,
+             current_directory=corpus_dir, raw_index_job=None, half_width=500, half_height=400,
+             user_settings_path=str(tmp_path_factory.mktemp('settings') / 'settings.json'),
+             KJV=bundle.lines('KJV').lines(), Amap=BlockMap(bundle.array('Amap')),
+             Info=bundle.verse_table('Info'), back=[], forward=[],
+             result_cache=ResultCache(16 << 20),
+             regex_pool=RegexPool(read_lines, corpus_dir, 'Rnew'),
+             linehighlightcolor=Abib.QtGui.QColor('#0138b7'),
+             linetextcolor=Abib.QtGui.QColor('#ffffff'))
+    main = [node for node in ast.parse(Path(Abib.__file__).read_text(encoding='utf-8')).body
+            if isinstance(node, ast.If)][-1]
+    for node in main.body:
+        target = node.target if isinstance(node, ast.AnnAssign) else \
+            node.targets[0] if isinstance(node, ast.Assign) else None
+        if isinstance(target, ast.Name) and target.id not in g:
+            try:
+                g[target.id] = ast.literal_eval(node.value)
+            except ValueError:
+                pass
+    g['P119'] = [g['Amap'][x_] for x_ in g['Ps119']]
+
+    w = Abib.MainWindow()
+    g['w'] = w
+    w.y = w.yend = w.no_f3_yet = 0
+    w.result = None
+    w.message = ''
+    w.otherFileFlag = False
+    w.ref_to_statusbar = lambda x_: None
+    w.file_open(str(corpus_dir / 'KJB_PCE.txt'))
+    w.resize(900, 1000)
+    w.show()
+    w.first_painted()
+    wait(app, w.load_job.future.done)
+    w.dlg = Abib.FindDialog(w)
+    yield w
+    g['regex_pool'].shutdown()
@@ -0,0 +1,101 @@
+"""Tests of corpus.py."""
+import pytest
+
+from corpus import BUNDLE_NAME, load_bundle
+
+
+def test_bundle_is_built_in_bundle_dir(corpus_dir, tmp_path):
+    bundle_dir = tmp_path / 'Abib'
+    bundle = load_bundle(corpus_dir, bundle_dir=bundle_dir)
+    assert (bundle_dir / BUNDLE_NAME).exists() and not bundle.in_memory
+    assert bundle.lines('Rnew').lines() == load_bundle(corpus_dir).lines('Rnew').lines()
+
+
+def test_bundle_is_built_in_memory_if_it_cannot_be_written(corpus_dir, tmp_path):
+    (tmp_path / 'file').write_text('')
+    bundle = load_bundle(corpus_dir, bundle_dir=tmp_path / 'file' / 'Abib')
+    assert bundle.in_memory
+    assert list(bundle.array('Amap')) == list(load_bundle(corpus_dir).array('Amap'))
+
+
+def info_lists():
+    """The [book, chapter, verse] lists of Info.txt, as Abib read them before."""
+
+    from conftest import REPO
+    from corpus import EOF_INFO, read_json_lines
+
+    return read_json_lines(str(REPO / 'Info.txt'), EOF_INFO)
+
+
+def test_verse_table_as_the_info_lists():
+    from corpus import VerseTable
+
+    info = info_lists()
+    table = VerseTable(*zip(*info))
+    assert len(table) == len(info) and [list(bcv) for bcv in table] == info
+    for x_ in (0, 1, 22, 23144, 23145, len(info) - 1):
+        assert list(table[x_]) == info[x_] and table.index(info[x_]) == x_
+    assert table.book_count() == 66 and table.chapter_count(18) == 150
+    assert table.verse_count(18, 118) == 176 and table.book_start(39) == 23145
+    assert table.chapter_start(0, 1) == 31
+
+
+def test_verse_table_index_of_no_verse():
+    from corpus import VerseTable
+
+    table = VerseTable(*zip(*info_lists()))
+    for bcv in ([0, 0, 31], [0, 50, 0], [66, 0, 0], [0, 0, -1], [-1, 0, 0]):
+        with pytest.raises(ValueError):
+            table.index(bcv)
+
+
+def test_block_map_both_ways():
+    from conftest import REPO
+    from corpus import EOF_AMAP, BlockMap, read_numbers
+
+    blocks = list(read_numbers(str(REPO / 'Amap.txt'), EOF_AMAP))
+    amap = BlockMap(blocks)
+    assert len(amap) == len(blocks) and list(amap) == blocks
+    for x_ in (0, 1, 1000, len(blocks) - 1):
+        assert amap[x_] == blocks[x_] and blocks[x_] in amap and amap.index(blocks[x_]) == x_
+        assert amap.verse_at_or_after(blocks[x_]) == x_
+    title = blocks[0] - 1       # The title before Genesis 1:1.
+    assert title not in amap and amap.verse_at_or_after(title) == 0
+    assert amap.verse_at_or_after(blocks[-1] + 1) == len(blocks)
+    for block in (title, -1, blocks[-1] + 1):
+        with pytest.raises(ValueError):
+            amap.index(block)
+
+
+def test_offset_map_places():
+    from array import array
+
+    from corpus import OffsetMap, stripped_breaks
+
+    # Verse 0 gains a character before offset 2 and two before offset 5;
+    # verse 1 none.
+    omap = OffsetMap(array('I', [0, 3, 3]), array('I', [2, 5, 5]))
+    assert len(omap) == 2
+    assert [omap.place(0, k) for k in range(7)] == [0, 1, 3, 4, 5, 8, 9]
+    assert [omap.place(1, k) for k in range(3)] == [0, 1, 2]
+    assert stripped_breaks('And God said', 'And, God said:') == [3]
+
+
+@pytest.mark.parametrize('found', ['And God said, Let there be light: and there was light.',
+                                   '(For the LORD’s portion is his people;) Jacob.',
+                                   'Then said he, Lo, I come.'])
+def test_stripped_words_placed_in_the_find_text(found):
+    from array import array
+
+    from corpus import OffsetMap, stripped_breaks
+
+    stripped = ' '.join(''.join(c for c in word if c.isalnum() or c == '’')
+                        for word in found.split())
+    breaks = stripped_breaks(stripped, found)
+    ostp = OffsetMap(array('I', [0, len(breaks)]), array('I', breaks))
+    k = 0
+    for word in stripped.split():
+        k = stripped.index(word, k)
+        start, end = ostp.place(0, k), ostp.place(0, k + len(word) - 1) + 1
+        assert found[start:end] == word
+        k += len(word)
@@ -0,0 +1,132 @@
+"""Tests of finding in Abib's MainWindow."""
+from conftest import wait
+
+# checks[0]: 1 Raw, 2 Whole words, 3 All of the words; checks[1]: 1 if the
+# case matters; checks[2]: 5, or 6 for a regex.
+RAW, WHOLE_WORDS, ALL = [1, 1, 5], [2, 0, 5], [3, 0, 5]
+
+
+def find(app, w, key: str, checks: list[int]) -> None:
+    """Find key in the whole Bible, as the Find dialog does."""
+
+    w.dlg.checks = list(checks)
+    w.findf3(key, 0, 65)
+    wait(app, lambda: w.find_job is None)
+
+
+def test_f4_through_many_matches_on_screen(app, main_window):
+    w = main_window
+    for key, checks in (('LORD', RAW), ('lord god', WHOLE_WORDS), ('lord god', ALL)):
+        find(app, w, key, checks)
+        assert w.result.total > 500
+        lines = []
+        for _ in range(60):
+            w.f4()
+            app.processEvents()
+            lines.append(w.get_line_number())
+            assert w.textEditor.extraSelections(), 'the matches on screen are marked'
+        assert lines == sorted(lines) and len(set(lines)) > 1
+
+
+def test_cancelled_dialog_leaves_the_find_alone(app, main_window):
+    w = main_window
+    find(app, w, 'Melchizedek', RAW)
+    w.dlg.ui.radiobutton_3.setChecked(True)     # All of the words, then
+    w.dlg.live_count()
+    w.close_find_window()                       # Cancel.
+    try:
+        assert w.dlg.checks == RAW
+        for _ in range(w.result.total):
+            w.f4()
+            app.processEvents()
+    finally:
+        w.dlg.ui.radiobutton_1.setChecked(True)
+
+
+def test_search_keeps_the_checks_it_started_with(app, main_window):
+    w = main_window
+    w.dlg.checks = list(ALL)
+    w.findf3('lord god', 0, 65)
+    w.dlg.checks = list(RAW)    # As the live count used to, meanwhile.
+    wait(app, lambda: w.find_job is None)
+    assert w.result.checks == tuple(ALL)
+    assert w.result.total == len(set(w.result.verses))
+
+
+def test_find_after_the_search_data_failed_to_load(app, main_window, monkeypatch):
+    import Abib
+
+    w = main_window
+    job = Abib.LoadJob(lambda job_: 1 / 0)
+    job.run()
+    errors = []
+    monkeypatch.setattr(w, 'load_job', job)
+    monkeypatch.setattr(w, 'dlg', None)
+    monkeypatch.setattr(w, 'on_error', lambda message, *_: errors.append(message))
+    w.onFindBtnClicked()
+    assert w.dlg is None and w.after_load is None
+    assert errors == ['Search indices failed to load.']
+
+
+def test_regex_search_in_spawned_workers(app, main_window):
+    w = main_window
+    find(app, w, 'Melchi[sz]ede[kc]', [1, 1, 6])
+    assert w.result.total == 11   # Melchizedek twice in the Old Testament, Melchisedec in the New.
+
+
+def test_live_count_keeps_its_interval_and_settles(app, main_window):
+    dlg = main_window.dlg
+    ui = dlg.ui
+    counts = []
+    count = lambda: counts.append(1)
+    dlg.live_timer.timeout.connect(count)
+    try:
+        ui.comboBox_2.setCurrentIndex(0)
+        ui.comboBox_1.setCurrentIndex(40)
+        ui.lineEdit_1.setText('LORD')
+        assert dlg.live_timer.interval() == 150
+        wait(app, lambda: counts and not dlg.live_timer.isActive())
+        for _ in range(40):     # A reversed scope, put right, doesn't start it again.
+            app.processEvents()
+        assert not dlg.live_timer.isActive() and len(counts) == 1
+        assert (ui.comboBox_1.currentIndex(), ui.comboBox_2.currentIndex()) == (0, 40)
+    finally:
+        dlg.live_timer.timeout.disconnect(count)
+        ui.lineEdit_1.clear()
+        ui.comboBox_1.setCurrentIndex(0)
+        ui.comboBox_2.setCurrentIndex(65)
+        dlg.live_timer.stop()
+
+
+def test_find_that_fails_still_finishes(app, main_window, monkeypatch):
+    w = main_window
+    errors = []
+    monkeypatch.setattr(w, 'on_error', lambda message, *_: errors.append(message))
+    find(app, w, 'a{99999999999}', [1, 1, 6])
+    assert len(errors) == 1 and errors[0].startswith('Search failed')
+
+
+def test_finds_report_the_cache(app, main_window, monkeypatch, capsys):
+    import Abib
+
+    w = main_window
+    monkeypatch.setitem(w.settings, 'report_timings', True)
+    monkeypatch.setattr(Abib, 'result_cache', Abib.ResultCache(16 << 20))
+    find(app, w, 'Melchizedek', WHOLE_WORDS)
+    find(app, w, 'Melchizedek', WHOLE_WORDS)
+    w.findf3('Melchizedek', 0, 38)      # The Old Testament, from the first.
+    report = [line for line in capsys.readouterr().out.splitlines() if 'Find "' in line]
+    assert [line[line.index('bytes, '):] for line in report] == [
+        'bytes, 0 hits, 0 narrowed, 1 misses)',
+        'bytes, 1 hits, 0 narrowed, 1 misses)',
+        'bytes, 1 hits, 1 narrowed, 1 misses)']
+
+
+def test_raw_matches_marked_as_counted(app, main_window):
+    import Abib
+
+    w = main_window
+    find(app, w, 'lel', RAW)   # Twice, overlapping, in Jehalelel.
+    result = w.result
+    verses = {result.hit(i)[0] for i in range(result.total)}
+    assert result.total == sum(len(Abib.matches_in(result, x_)) for x_ in verses)
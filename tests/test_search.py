@@ -0,0 +1,295 @@
+"""Tests of the search indices in the corpus bundle."""
+from corpus import load_bundle
+import re
+from array import array
+
+import pytest
+
+from search import (PositionalIndex, Ranked, Ranking, RawText, ResultCache, SearchResult,
+                    SuffixArray, TypedPhrase, bm25, intersect, nested_quantifier, postings_of,
+                    regex_words, restrict, suffix_array, tokenize, union)
+
+VERSES = ['In the beginning God created the heaven and the earth\n',
+          'And the earth was without form\n',
+          'And God said Let there be light and there was light\n']
+
+
+def small_index(verses: list[str]) -> PositionalIndex:
+    """A PositionalIndex of verses, as the bundle holds one."""
+
+    vocabulary, token_ids, verse_of, start_of, verse_start = tokenize(verses)
+    offsets, postings = postings_of(vocabulary, token_ids)
+    return PositionalIndex(vocabulary, offsets, postings, token_ids, verse_of, start_of,
+                           verse_start)
+
+
+def test_posting_store_get_to_the_end(corpus_dir):
+    store = load_bundle(corpus_dir).posting_store('stripped_dict')
+    postings = store['LORD']
+    x1 = postings[len(postings) // 2]
+    assert list(store.get('LORD', x1)) == list(restrict(postings, x1, postings[-1]))
+    assert list(store.get('LORD', x1)) == [x_ for x_ in postings if x_ >= x1]
+    assert list(store.get('LORD')) == list(postings)
+    assert list(store.get('LORD', 0, x1)) == [x_ for x_ in postings if x_ <= x1]
+    assert not store.get('no such word', x1)
+
+
+@pytest.fixture(scope='module')
+def bundle(corpus_dir):
+    return load_bundle(corpus_dir)
+
+
+@pytest.mark.parametrize('phrase', ['sons’', 'sons’ wives', 'my sons’', 'the days’ journey',
+                                    'son’s wife', 'and the LORD'])
+def test_typed_phrase_counts_as_found(bundle, phrase):
+    index = bundle.positional_index('Pstp')
+    words = phrase.split()
+    for x1, x2 in ((0, -1), (0, 23144), (23145, -1)):
+        found = len(index.spans(words, x1, x2))
+        assert TypedPhrase(index).count(words, '', x1, x2) == found
+        typed = TypedPhrase(index)     # Typed a character at a time.
+        for i in range(1, len(phrase) + 1):
+            *done, prefix = phrase[:i].split(' ')
+            n = typed.count(done, prefix, x1, x2)
+        assert n >= found       # The last word as begun, then as typed.
+        assert typed.count(words, '', x1, x2) == found
+
+
+@pytest.mark.parametrize('key, words', [
+    (' the LORD said ', ('the', 'LORD', 'said')),
+    ('and (the|a) LORD', ()),                   # Alternation.
+    (' the [abc] lord ', ('the', 'lord')),
+    ('[] the ]foo', ()),                        # A leading ] is in the class.
+    ('[^] the ]foo', ()),
+    ('( [)] x ) the god', ('the',)),             # Classes inside groups.
+    (' th?e lord ', ('lord',)),                 # A word that may change isn't required.
+    (r' \d+ the ', ('the',)),
+])
+def test_regex_words(key, words):
+    assert regex_words(key) == words
+
+
+@pytest.mark.parametrize('key', ['[] the ]foo', '[^] the ]foo', ' the [abc] lord ', ' th?e lord '])
+def test_regex_words_are_in_every_match(key):
+    for text in (' the b lord ', ' the lord ', ' a]foo', ' x]foo', ' te lord '):
+        if re.search(key, text):
+            assert all(f' {word} ' in f' {text} ' for word in regex_words(key))
+
+
+@pytest.mark.parametrize('key, nested', [
+    ('(a+)+', True), ('(a*)*b', True), ('(ab){2,}c+', False), ('(a|b)+', False),
+    ('[(a+)]+', False), ('[](a+)]+', False), ('[^](a+)]+', False), (r'\(a+\)+', False),
+    ('((a)+x)+', True),
+])
+def test_nested_quantifier(key, nested):
+    assert nested_quantifier(key) is nested
+
+
+def worker_verses() -> list[str]:
+    """The verses of a RegexPool worker process."""
+    return ['in the beginning\n']
+
+
+def test_regex_workers_are_kept_after_a_cancel():
+    from search import RegexPool
+
+    pool = RegexPool(worker_verses, workers=1)
+    try:
+        assert list(pool.regex('begin+ing', False, 0, 0, [0, 1])) == [(0, [(7, 16)])]
+        first = pool._pool
+        list(pool.regex('begin', False, 0, 0, [0, 1], cancelled=lambda: True))
+        assert list(pool.regex('in', False, 0, 0, [0, 1])) == [(0, [(0, 2), (10, 12), (13, 15)])]
+        assert pool._pool is first
+    finally:
+        pool.shutdown()
+
+
+def test_processes_started_without_the_main_script(monkeypatch):
+    import sys
+    from types import ModuleType
+    from multiprocessing.spawn import get_preparation_data
+
+    import processes
+
+    main = ModuleType('__main__')
+    main.__file__ = 'Abib.py'
+    monkeypatch.setitem(sys.modules, '__main__', main)
+    assert 'init_main_from_path' in get_preparation_data('x')
+    with processes._without_main():
+        data = get_preparation_data('x')
+    assert 'init_main_from_path' not in data and 'init_main_from_name' not in data
+    assert sys.modules['__main__'] is main
+
+
+def test_positional_index_of_words():
+    index = small_index(VERSES)
+    assert 'earth' in index and 'Earth' not in index and index.token_id('Earth') == -1
+    assert index.count('the') == 4 and index.count('light') == 2
+    assert list(index.postings('earth')) == [9, 12]
+    assert list(index.postings('earth', 1, 1)) == [12] and list(index.postings('earth', 2)) == []
+    assert index.prefix_count('th') == 6 and index.prefix_count('th', 2, 2) == 2
+    assert index.verse_spans(['the'], 0, -1) == {0: [(3, 6), (29, 32), (44, 47)], 1: [(4, 7)]}
+    assert index.verse_spans(['God'], 1, 2) == {2: [(4, 7)]}
+
+
+@pytest.mark.parametrize('word', ['LORD', 'Melchizedek', 'the', 'begat'])
+def test_positional_index_finds_each_whole_word(bundle, word):
+    index = bundle.positional_index('Pstp')
+    rstp = bundle.lines('Rstp').lines()
+    found = index.verse_spans([word], 0, -1)
+    for x_, line in enumerate(rstp):
+        spans = [m.span() for m in re.finditer(rf'(?<!\S){re.escape(word)}(?!\S)', line)]
+        assert found.get(x_, []) == spans
+
+
+@pytest.mark.parametrize('lists', [
+    [[1, 3, 5, 7, 9], [3, 4, 5, 9, 10], [0, 3, 9, 11]],
+    [[2], list(range(0, 1000, 2))],
+    [list(range(0, 1000, 3)), list(range(0, 1000, 5)), list(range(0, 1000, 7))],
+    [[1, 2], []],
+    [],
+])
+def test_intersect_and_union(lists):
+    arrays = [array('I', values) for values in lists]
+    expected = sorted(set(lists[0]).intersection(*lists[1:])) if lists else []
+    assert list(intersect(arrays)) == expected
+    assert list(union(arrays)) == sorted(set().union(*lists))
+
+
+def test_posting_store_lists(bundle):
+    store = bundle.posting_store('stripped_dict')
+    rstp = bundle.lines('Rstp').lines()
+    assert len(store) > 10000 and 'Melchizedek' in store and 'melchizedek' not in store
+    verses = [x_ for x_, line in enumerate(rstp) if 'Melchizedek' in line.split()]
+    assert list(store['Melchizedek']) == verses
+    assert list(store.get('Melchizedek', verses[1], verses[1])) == [verses[1]]
+    both = intersect([store['Melchizedek'], store['priest']])
+    assert list(both) == [x_ for x_ in verses if 'priest' in rstp[x_].split()]
+    assert list(union([store['Melchizedek'], store['Melchisedec']])) == sorted(
+        verses + [x_ for x_, line in enumerate(rstp) if 'Melchisedec' in line.split()])
+
+
+def test_phrase_spans():
+    index = small_index(VERSES)
+    assert index.spans(['the', 'earth'], 0, -1) == [(0, 44, 53), (1, 4, 13)]
+    assert index.spans(['the', 'earth'], 1, -1) == [(1, 4, 13)]
+    assert index.spans(['earth', 'the'], 0, -1) == []
+    assert index.spans(['there', 'was', 'light'], 0, -1) == [(2, 36, 51)]
+    # Not across verses: "earth" ends verse 0, "And" begins verse 1.
+    assert index.spans(['earth', 'And'], 0, -1) == []
+
+
+def test_phrase_spans_with_slop():
+    index = small_index(VERSES)
+    assert index.spans(['God', 'the'], 0, -1) == []
+    assert index.spans(['God', 'the'], 0, -1, slop=1) == [(0, 17, 32)]
+    assert index.spans(['there', 'light'], 0, -1, slop=1) == [(2, 17, 31), (2, 36, 51)]
+    assert index.spans(['Let', 'light'], 0, -1, slop=2) == [(2, 13, 31)]
+    assert index.spans(['Let', 'light'], 0, -1, slop=1) == []
+    assert index.spans(['earth', 'And'], 0, -1, slop=5) == []
+
+
+@pytest.mark.parametrize('phrase', ['the LORD', 'the LORD God', 'son of David', 'I am'])
+def test_phrase_spans_as_found_in_the_text(bundle, phrase):
+    index = bundle.positional_index('Pstp')
+    rstp = bundle.lines('Rstp').lines()
+    pattern = re.compile(rf'(?<!\S){re.escape(phrase)}(?!\S)')
+    expected = [(x_, *m.span()) for x_, line in enumerate(rstp) for m in pattern.finditer(line)]
+    assert index.spans(phrase.split(), 0, -1) == expected
+
+
+@pytest.mark.parametrize('text', ['banana', 'mississippi', 'aaaaaaaa', 'abab' * 20, '', 'a',
+                                  ''.join(VERSES)])
+@pytest.mark.parametrize('k', [1, 2, 32])
+def test_suffix_array(text, k):
+    assert list(suffix_array(text, k)) == sorted(range(len(text)), key=lambda p: text[p:])
+
+
+@pytest.mark.parametrize('key', ['the', 'th', 'e', 'light', 'and there', 'ere', 'LORD', 'x',
+                                 'earth\n', 'h\nAnd'])
+def test_suffix_array_answers_as_the_text(key):
+    raw = RawText(VERSES * 3)
+    sa = SuffixArray(raw, suffix_array(raw.text))
+    for x1, x2 in ((0, -1), (1, 4), (3, 3), (8, -1)):
+        assert sa.count(key, x1, x2) == raw.count(key, x1, x2)
+        assert list(sa.hits(key, x1, x2)) == list(raw.hits(key, x1, x2))
+
+
+def test_raw_hits_overlap():
+    raw = RawText(['aaaa\n', 'xaax\n'])
+    assert raw.count('aa') == 4
+    assert list(raw.hits('aa')) == [(0, 0, 1), (0, 1, 2), (0, 2, 3), (1, 1, 4)]
+    assert list(raw.hits('aa', 1)) == [(1, 1, 1)]
+
+
+def a_result(verses: list[int]) -> SearchResult:
+    """A whole word result with a match at the start of each of verses."""
+    return SearchResult('w', 'w', (2, 1, 5), list(verses), [[(0, 1)] for _ in verses])
+
+
+def test_result_cache_hits_narrows_and_misses():
+    cache = ResultCache(1 << 20)
+    query = ('w', (2, 1, 5), None)
+    assert cache.get(query, 0, 99, SearchResult.narrow) is None
+    result = a_result([1, 5, 20, 50, 90])
+    cache.put(query, 0, 99, result, result.size())
+    assert cache.get(query, 0, 99, SearchResult.narrow) is result
+    narrowed = cache.get(query, 10, 60, SearchResult.narrow)
+    assert narrowed.verses == [20, 50] and narrowed.total == 2 and narrowed.scope == (10, 60)
+    assert cache.get(query, 10, 60) is None                 # Without narrow, a miss.
+    assert cache.get(query, 50, 200, SearchResult.narrow) is None   # Not covered.
+    assert cache.get(('x', (2, 1, 5), None), 10, 60, SearchResult.narrow) is None
+    assert (cache.hits, cache.narrowed, cache.misses) == (1, 1, 4)
+
+
+def test_result_cache_drops_the_least_recently_used():
+    cache = ResultCache(3000)
+    results = {verse: a_result([verse]) for verse in range(4)}
+    for verse, result in results.items():
+        cache.put(verse, 0, 9, result, 1000)
+        if verse == 2:
+            cache.get(0, 0, 9)     # Used, so kept.
+    assert len(cache) == 3 and cache.size == 3000
+    assert cache.get(1, 0, 9) is None and cache.get(0, 0, 9) is results[0]
+    cache.put(9, 0, 9, a_result([9]), 4000)     # Too big to keep.
+    assert len(cache) == 3 and cache.get(9, 0, 9) is None
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_bm25_scores():
+    index = small_index(VERSES)
+    found = [index.verse_spans([word], 0, -1) for word in ('light', 'the')]
+    scores = bm25(index, found, [1, 2])
+    assert set(scores) == {0, 1, 2}
+    # The rarer word, twice in its verse, counts for most.
+    assert scores[2] > scores[0] > scores[1] > 0
+    # A word counts for more in a shorter verse, but less than in
+    # proportion to how often it is found.
+    the = bm25(index, [found[1]], [2])
+    assert the[1] < the[0] < 3 * the[1]
+
+
+@pytest.mark.parametrize('page', [1, 2, 20])
+def test_ranking_best_first_a_page_at_a_time(page):
+    scores = {5: 1.0, 3: 2.5, 9: 1.0, 1: 0.5, 7: 2.5}
+    ranking = Ranking(scores, page)
+    assert len(ranking) == 5
+    assert ranking[0] == 3 and len(ranking._ranked) == min(page, 5)
+    assert list(ranking) == [3, 7, 5, 9, 1]     # Ties in verse order.
+    assert ranking[-1] == 1 and ranking[1:3] == [7, 5]
+    with pytest.raises(IndexError):
+        ranking[5]
+    ranked = Ranked(Ranking(scores, page), {x_: [(0, x_)] for x_ in scores})
+    assert len(ranked) == 5 and ranked.matches == 5 and ranked[0] == [(0, 3)]
+    assert list(ranked)[-1] == [(0, 1)]
+
+
+def test_any_of_the_words_ranked(bundle):
+    index = bundle.positional_index('Pstp')
+    words = ['Melchizedek', 'priest']
+    found = [index.verse_spans([word], 0, -1) for word in words]
+    ranking = Ranking(bm25(index, found, [len(f) for f in found]))
+    assert set(ranking) == set(found[0]) | set(found[1])
+    both = set(found[0]) & set(found[1])
+    assert set(ranking[:len(both)]) == both     # Those with both words first.
@@ -0,0 +1,39 @@
+"""Tests of Abib's MainWindow, other than finding."""
+from corpus import EOTNOC
+
+
+def test_bible_opened_from_the_bundle(app, main_window, corpus_dir, tmp_path, monkeypatch):
+    w = main_window
+    errors = []
+    monkeypatch.setattr(w, 'dialog_critical', errors.append)
+    text = (corpus_dir / 'KJB_PCE.txt').read_text(encoding='utf-8')
+    lines = text[text.find(EOTNOC) + len(EOTNOC):].split('\n')
+    w.file_open(str(tmp_path / 'KJB_PCE.txt'))     # Not there: it isn't read.
+    assert not errors and not w.otherFileFlag
+    assert w.reader.lines == lines[:len(w.reader.lines)] and len(lines) - len(w.reader.lines) <= 1
+
+
+def test_other_file_opened(app, main_window, tmp_path):
+    w = main_window
+    other = tmp_path / 'other.txt'
+    other.write_text('one\ntwo\nthree', encoding='utf-8')
+    try:
+        w.file_open(str(other))
+        assert w.otherFileFlag and w.reader.lines == ['one', 'two', 'three']
+        assert w.textEditor.toPlainText() == 'one\ntwo\nthree'
+    finally:
+        w.reload()
+    assert not w.otherFileFlag
+
+
+def test_beep_without_pygame(app, monkeypatch):
+    import sys
+
+    import Abib
+
+    monkeypatch.setitem(sys.modules, 'pygame', None)     # As if it weren't installed.
+    beep_sound = Abib.Lazy(Abib.load_beep)
+    beep_sound.play()
+    made = beep_sound._made
+    beep_sound.play()
+    assert isinstance(made, Abib.SystemBeep) and beep_sound._made is made